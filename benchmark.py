@@ -0,0 +1,421 @@
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board import MSBoard, generate_bomb_positions, get_board_size
+from bitboard import BitBoard, BitSolver
+from budget import SearchBudget
+from cache import ComponentCache
+from compact import CompactBoard, CompactSolver
+from csp import MSCSP
+from patterns import PATTERNS_FILE, PatternTable, generate_table
+from sat import SATSolver
+from profiling import PHASES, PROFILE_HEADERS, Profiler, sum_profiles
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+# (board class, solver class) of each solver backend
+BACKENDS = {
+    "csp": (MSBoard, MSCSP),
+    "bitboard": (BitBoard, BitSolver),
+    "compact": (CompactBoard, CompactSolver),
+    "sat": (MSBoard, SATSolver)
+}
+
+# number of games handed to a worker at a time
+CHUNK_SIZE = 256
+
+CSV_HEADERS = ["Iteration", "Time (seconds)", "Result", "Guesses",
+               "Search Size"]
+
+
+def seeded_layout(rows, cols, num_mines, seed, generator="random",
+                  rng=None):
+    """
+    Returns the mine positions of the game seeded by seed. generator is
+    "random" to place the mines with rng, a random.Random(seed) by default,
+    or "numpy" to take the board from a batch generated by generate.py.
+    """
+    if generator == "numpy":
+        from generate import seeded_bomb_positions
+        return seeded_bomb_positions(rows, cols, num_mines, seed)
+    return generate_bomb_positions(rows, cols, num_mines,
+                                   rng or random.Random(seed))
+
+
+def new_game(difficulty, seed, backend="csp", generator="random",
+             record_actions=False, profiler=None, cache=None, patterns=None,
+             budget=None, bomb_positions=None, start=None):
+    """
+    Sets up the headless game seeded by seed and returns (solver,
+    bomb_positions), with the starting square already uncovered. The mines
+    are placed by a random.Random(seed) (see seeded_layout), which then
+    makes the solver's guesses, so the whole game is determined by its seed.
+    difficulty is a difficulty name or a custom "ROWSxCOLSxMINES" size.
+    profiler, cache, patterns and budget are passed to the solver.
+
+    A recorded game passes its bomb_positions and start square (x, y). The
+    seeded layout is still generated, so that the solver's guesses come from
+    the same point of the random stream, but the recorded one is played.
+    """
+    board_class, solver_class = BACKENDS[backend]
+    rng = random.Random(seed)
+    board = board_class(*get_board_size(difficulty))
+    generated = seeded_layout(board.rows, board.cols, board.num_mines, seed,
+                              generator, rng)
+    if bomb_positions is None:
+        bomb_positions = generated
+    board.create_layout(bomb_positions)
+    if start is None:
+        board.uncover_first_non_bomb_tile()
+    else:
+        board.uncover_starting_point(*start)
+    solver = solver_class(board=board, rng=rng, record_actions=record_actions,
+                          profiler=profiler, cache=cache, patterns=patterns,
+                          budget=budget)
+    return solver, bomb_positions
+
+
+def play_game(difficulty, seed, backend="csp", generator="random",
+              profile=False, cache=None, patterns=None, budget_seconds=None,
+              budget_nodes=None, vectorized=False):
+    """
+    Plays one headless computer game set up by new_game and returns a
+    dictionary with the pure solver time in seconds, the result ("W" or "L"),
+    the number of guesses and the largest frontier handed to search(). If
+    profile is True, it also holds the game's profile from profiling.py. If a
+    cache.ComponentCache is given, the game solves its components through it
+    and the dictionary also holds the game's cache hits and misses and the
+    size of the cache afterwards. If a patterns.PatternTable is given, the
+    solver consults it before each search and the dictionary also holds the
+    number of searches it answered. If budget_seconds or budget_nodes is
+    given, each search is bounded by a budget.SearchBudget and the dictionary
+    also holds the number of searches that ran out of it, whose answers were
+    not exact, and the sampler that estimated them: "numpy" if vectorized is
+    True, "python" otherwise.
+    """
+    profiler = Profiler() if profile else None
+    budget = None
+    if budget_seconds is not None or budget_nodes is not None:
+        budget = SearchBudget(seconds=budget_seconds, nodes=budget_nodes,
+                              vectorized=vectorized)
+    # the mine layout is not kept during the game: on a very large board it
+    # takes more memory than the board itself
+    csp = new_game(difficulty, seed, backend, generator, profiler=profiler,
+                   cache=cache, patterns=patterns, budget=budget)[0]
+    if cache is not None:
+        hits = cache.hits
+        misses = cache.misses
+    start = time.perf_counter()
+    csp.start_game()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "time": elapsed,
+        "result": "W" if csp.won_game() else "L",
+        "guesses": csp.num_guesses,
+        "search_size": csp.search_size
+    }
+    if profiler is not None:
+        result["profile"] = profiler.as_dict()
+    if cache is not None:
+        result["cache_hits"] = cache.hits - hits
+        result["cache_misses"] = cache.misses - misses
+        result["cache_entries"] = len(cache)
+        result["cache_bytes"] = cache.bytes
+    if patterns is not None:
+        result["pattern_hits"] = csp.pattern_hits
+    if budget is not None:
+        result["searches"] = budget.searches
+        result["inexact_searches"] = budget.exceeded
+        result["max_error"] = budget.max_error
+        result["sampler"] = "numpy" if vectorized else "python"
+    return result
+
+
+def run_benchmark(difficulty, num_games, seed=0, backend="csp",
+                  generator="random", profile=False, cache_entries=0,
+                  patterns_file=None, budget_seconds=None, budget_nodes=None,
+                  vectorized=False):
+    """
+    Plays num_games games of the given difficulty, using seeds seed,
+    seed + 1, ..., and returns the list of results from play_game. If
+    cache_entries is not 0, the games share a ComponentCache of that many
+    entries. If patterns_file is given, the games consult that pattern
+    table. budget_seconds, budget_nodes and vectorized are passed to
+    play_game.
+    """
+    cache = None
+    if cache_entries:
+        cache = ComponentCache(max_entries=cache_entries)
+    patterns = None
+    if patterns_file:
+        patterns = PatternTable(patterns_file)
+    results = []
+    for i in range(num_games):
+        results.append(play_game(difficulty, seed + i, backend, generator,
+                                 profile, cache, patterns, budget_seconds,
+                                 budget_nodes, vectorized))
+    if patterns is not None:
+        patterns.close()
+    return results
+
+
+def run_chunk(chunk):
+    """
+    Worker entry point: chunk is a tuple of run_benchmark arguments.
+    """
+    return run_benchmark(*chunk)
+
+
+def run_parallel_benchmark(difficulty, num_games, seed=0, backend="csp",
+                           generator="random", workers=None, profile=False,
+                           cache_entries=0, patterns_file=None,
+                           budget_seconds=None, budget_nodes=None,
+                           vectorized=False):
+    """
+    Same as run_benchmark, but shards the games in chunks of CHUNK_SIZE
+    across a pool of workers processes. Every game is still seeded by its
+    index, and chunks are merged back in order, so the results do not depend
+    on the number of workers. Each chunk has its own cache, and maps the
+    pattern file on its own.
+    """
+    chunks = []
+    for start in range(0, num_games, CHUNK_SIZE):
+        chunks.append((difficulty, min(CHUNK_SIZE, num_games - start),
+                       seed + start, backend, generator, profile,
+                       cache_entries, patterns_file, budget_seconds,
+                       budget_nodes, vectorized))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=sys.setrecursionlimit,
+                             initargs=(10000,)) as executor:
+        for chunk_results in executor.map(run_chunk, chunks):
+            results.extend(chunk_results)
+    return results
+
+
+def write_stats_csv(filename, results):
+    """
+    Writes results to filename in the format read by graphs.py, with the
+    guess count and search size as extra trailing columns, followed by the
+    PROFILE_HEADERS columns if the games were profiled.
+    """
+    profiled = bool(results) and "profile" in results[0]
+    with open(filename, mode="w", encoding='utf-8-sig', newline='') as file:
+        csvwriter = csv.writer(file)
+        csvwriter.writerow(CSV_HEADERS + (PROFILE_HEADERS if profiled else []))
+        for i, result in enumerate(results):
+            row = [i + 1,
+                   f"{result['time']:.6f}",
+                   result["result"],
+                   result["guesses"],
+                   result["search_size"]]
+            if profiled:
+                for key in PROFILE_HEADERS:
+                    value = result["profile"][key]
+                    row.append(f"{value:.6f}" if key.endswith("seconds")
+                               else value)
+            csvwriter.writerow(row)
+
+
+def write_profile_json(filename, results):
+    """
+    Writes the profile of every game of results, and their total, to
+    filename as JSON.
+    """
+    profiles = [result["profile"] for result in results]
+    with open(filename, mode="w", encoding="utf-8") as file:
+        json.dump({"total": sum_profiles(profiles), "games": profiles}, file,
+                  indent=1)
+
+
+def print_profile(results):
+    """
+    Prints the share of the solver time spent in each phase.
+    """
+    total = sum_profiles(result["profile"] for result in results)
+    seconds = sum(total[f"{phase} seconds"] for phase in PHASES) or 1
+    for phase in PHASES:
+        print(f"  {phase}: {total[f'{phase} calls']} calls, "
+              f"{total[f'{phase} seconds']:.2f}s "
+              f"({100 * total[f'{phase} seconds'] / seconds:.0f}%)")
+    print(f"  {total['components']} components, "
+          f"{total['search nodes']} search nodes, "
+          f"{total['solutions']} solutions, "
+          f"{sum(r['guesses'] for r in results)} guesses")
+
+
+def board_size_arg(s):
+    """
+    argparse type of --difficulty: a difficulty name or "ROWSxCOLSxMINES".
+    """
+    try:
+        get_board_size(s)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return s
+
+
+def seed_arg(s):
+    """
+    argparse type of --seed: a non-negative integer, as NumPy generators
+    require.
+    """
+    seed = int(s)
+    if seed < 0:
+        raise argparse.ArgumentTypeError(f"seed must not be negative: {s}")
+    return seed
+
+
+def print_cache_stats(results):
+    """
+    Prints the hit rate and the largest size of the component caches.
+    """
+    hits = sum(result["cache_hits"] for result in results)
+    misses = sum(result["cache_misses"] for result in results)
+    lookups = hits + misses
+    rate = 100 * hits / lookups if lookups else 0
+    entries = max(result["cache_entries"] for result in results)
+    size = max(result["cache_bytes"] for result in results)
+    print(f"  cache: {hits}/{lookups} hits ({rate:.1f}%), up to {entries} "
+          f"entries and {size / 1024:.0f} KiB per cache")
+
+
+def print_pattern_stats(results):
+    """
+    Prints the number of searches answered by the pattern table.
+    """
+    hits = sum(result["pattern_hits"] for result in results)
+    print(f"  patterns: {hits} searches answered from the table, "
+          f"{sum(r['guesses'] for r in results)} guesses")
+
+
+def print_budget_stats(results):
+    """
+    Prints the share of searches that ran out of their budget, the sampler
+    that estimated them, and the largest standard error of the probabilities
+    it sampled.
+    """
+    searches = sum(result["searches"] for result in results)
+    inexact = sum(result["inexact_searches"] for result in results)
+    rate = 100 * inexact / searches if searches else 0
+    errors = [result["max_error"] for result in results
+              if result["max_error"] is not None]
+    error = f", largest error {max(errors):.3f}" if errors else ""
+    print(f"  budget: {inexact}/{searches} searches ran out and were "
+          f"estimated ({rate:.2f}%) by the {results[0]['sampler']} "
+          f"sampler{error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Play seeded headless computer games and write "
+                    "data/<difficulty>-stats.csv.")
+    parser.add_argument("-n", "--games", type=int, default=1000,
+                        help="number of games per difficulty")
+    parser.add_argument("-d", "--difficulty", nargs="+", type=board_size_arg,
+                        default=DIFFICULTIES,
+                        help="easy, medium, hard or a custom board size "
+                             "ROWSxCOLSxMINES, e.g. 1000x1000x100000 (use "
+                             "the compact backend for very large boards)")
+    parser.add_argument("-s", "--seed", type=seed_arg, default=0,
+                        help="seed of the first game")
+    parser.add_argument("-b", "--backend", choices=list(BACKENDS),
+                        default="csp", help="board and solver implementation")
+    parser.add_argument("-g", "--generator", choices=["random", "numpy"],
+                        default="random",
+                        help="board generator (numpy generates boards in "
+                             "batches and requires NumPy)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes (0 for one per "
+                             "core)")
+    parser.add_argument("-p", "--profile", action="store_true",
+                        help="time each solver phase, add the profile to "
+                             "the stats CSV and write "
+                             "<difficulty>-profile.json")
+    parser.add_argument("-c", "--cache", type=int, default=0,
+                        metavar="ENTRIES",
+                        help="share a cache of solved frontier components "
+                             "of up to ENTRIES entries between the games of "
+                             "each worker (0 for no cache)")
+    parser.add_argument("--patterns", nargs="?", const=PATTERNS_FILE,
+                        metavar="FILE",
+                        help="play the forced moves of this pattern table "
+                             f"(default {PATTERNS_FILE}) before searching, "
+                             "generating it with patterns.py if it does not "
+                             "exist")
+    parser.add_argument("--budget-ms", type=float, metavar="MILLISECONDS",
+                        help="bound each search by this time, estimating "
+                             "the probabilities when it runs out")
+    parser.add_argument("--budget-nodes", type=int, metavar="NODES",
+                        help="bound each search by this number of search "
+                             "states (reproducible, unlike --budget-ms)")
+    parser.add_argument("--sampler", choices=["python", "numpy"],
+                        default="python",
+                        help="draw the samples of a search that ran out of "
+                             "its budget in pure Python or in NumPy batches "
+                             "(a different random stream, so a seeded game "
+                             "plays differently; requires NumPy)")
+    parser.add_argument("-o", "--output-dir", default="data")
+    args = parser.parse_args(argv)
+    if args.sampler == "numpy":
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            parser.error("--sampler numpy requires NumPy")
+    if args.patterns:
+        if not os.path.exists(args.patterns):
+            print(f"generating {args.patterns} from seeded games")
+            generate_table(args.patterns)
+        try:
+            PatternTable(args.patterns).close()
+        except ValueError as error:
+            parser.error(str(error))
+    os.makedirs(args.output_dir, exist_ok=True)
+    budget_seconds = None
+    if args.budget_ms is not None:
+        budget_seconds = args.budget_ms / 1000
+
+    for difficulty in args.difficulty:
+        start = time.perf_counter()
+        if args.workers == 1:
+            results = run_benchmark(difficulty, args.games, args.seed,
+                                    args.backend, args.generator,
+                                    args.profile, args.cache, args.patterns,
+                                    budget_seconds, args.budget_nodes,
+                                    args.sampler == "numpy")
+        else:
+            results = run_parallel_benchmark(difficulty, args.games,
+                                             args.seed, args.backend,
+                                             args.generator,
+                                             args.workers or None,
+                                             args.profile, args.cache,
+                                             args.patterns, budget_seconds,
+                                             args.budget_nodes,
+                                             args.sampler == "numpy")
+        elapsed = time.perf_counter() - start
+        write_stats_csv(f"{args.output_dir}/{difficulty}-stats.csv", results)
+        wins = sum(1 for r in results if r["result"] == "W")
+        print(f"{difficulty}: {wins}/{len(results)} wins in {elapsed:.2f}s")
+        if args.profile:
+            write_profile_json(
+                f"{args.output_dir}/{difficulty}-profile.json", results)
+            print_profile(results)
+        if args.cache and results:
+            print_cache_stats(results)
+        if args.patterns and results:
+            print_pattern_stats(results)
+        if (budget_seconds is not None or args.budget_nodes is not None) \
+                and results:
+            print_budget_stats(results)
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    main()
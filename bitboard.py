@@ -0,0 +1,335 @@
+"""
+Bitboard Minesweeper backend for the solver hot path.
+
+Squares are numbered in row-major order and the mines, uncovered squares and
+flags are each stored as one integer bitmask, and the unknown neighbors of a
+square are found with a precomputed neighbor mask. Every operation on a
+bitmask costs time proportional to the board, so the backend suits the
+standard difficulties; compact.py is the backend for large boards.
+"""
+import random
+from functools import lru_cache
+
+from frontier import solve_frontier
+from neighbors import get_neighbor_table
+
+CHUNK_MASK = (1 << 64) - 1
+
+
+@lru_cache(maxsize=None)
+def get_neighbor_masks(rows, cols):
+    """
+    Returns a tuple where entry i is (shift, mask): the squares adjacent to
+    square i of a rows by cols board are the set bits of mask << shift.
+    Shifting by the first neighbor keeps every mask within three rows, where
+    whole-board masks would take memory quadratic in the number of squares.
+    Shared by all boards of that size.
+    """
+    masks = []
+    for neighbors in get_neighbor_table(rows, cols).neighbors:
+        shift = min(neighbors, default=0)
+        mask = 0
+        for n in neighbors:
+            mask |= 1 << (n - shift)
+        masks.append((shift, mask))
+    return tuple(masks)
+
+
+def iter_bits(mask):
+    """
+    Yields the index of every set bit of mask, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def list_bits(mask):
+    """
+    Returns the indices of the set bits of mask, lowest first. Same as
+    iter_bits, but takes the bits 64 at a time from the lowest set one, so a
+    dense mask of a large board costs one shift of the mask per 64 squares
+    rather than one operation on the whole mask per set bit.
+    """
+    bits = []
+    base = 0
+    while mask:
+        skip = (mask & -mask).bit_length() - 1
+        mask >>= skip
+        base += skip
+        chunk = mask & CHUNK_MASK
+        mask >>= 64
+        while chunk:
+            low = chunk & -chunk
+            bits.append(base + low.bit_length() - 1)
+            chunk ^= low
+        base += 64
+    return bits
+
+
+class BitBoard():
+    """
+    Minesweeper board stored as bitmasks. Offers the same setup methods as
+    MSBoard so the two can be built from the same bomb positions.
+    """
+
+    def __init__(self, rows, cols, num_mines):
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        self.size = rows * cols
+        self.full_mask = (1 << self.size) - 1
+        self.neighbors = get_neighbor_table(rows, cols).neighbors
+        self.neighbor_masks = get_neighbor_masks(rows, cols)
+        self.mines = 0
+        self.uncovered = 0
+        self.flagged = 0
+        self.numbers = bytearray(self.size)
+        self.starting_point = None
+
+    def create_layout(self, bomb_positions):
+        self.mines = 0
+        for x, y in bomb_positions:
+            i = x * self.cols + y
+            self.mines |= 1 << i
+            for n in self.neighbors[i]:
+                self.numbers[n] += 1
+
+    def neighbor_mask(self, i):
+        """
+        Returns the bitmask of the squares adjacent to square i.
+        """
+        shift, mask = self.neighbor_masks[i]
+        return mask << shift
+
+    def uncover_first_non_bomb_tile(self):
+        """
+        Uncovers the first non-bomb square with the fewest adjacent bombs,
+        records it as the starting point and returns its index.
+        """
+        mines = self.mines
+        mab = min(n for i, n in enumerate(self.numbers)
+                  if not (mines >> i) & 1)
+        for i in range(self.size):
+            if not (self.mines >> i) & 1 and self.numbers[i] == mab:
+                self.uncovered |= 1 << i
+                self.starting_point = divmod(i, self.cols)
+                return i
+
+    def uncover_starting_point(self, x, y):
+        self.uncovered |= 1 << (x * self.cols + y)
+        self.starting_point = (x, y)
+
+    def is_solved(self):
+        """
+        Returns True if every non-bomb square has been uncovered.
+        """
+        return self.uncovered | self.mines == self.full_mask
+
+
+class BitSolver():
+    """
+    Minesweeper solver on a BitBoard. Plays a strategy close to MSCSP's: it
+    applies the single-constraint rules until nothing changes, then solves
+    the frontier exactly and probes the least likely mine. The number of
+    flagged and unknown neighbors of every square is kept up to date as
+    squares are probed and flagged, so the rules only re-examine the
+    numbered squares next to a change, without touching the board's
+    bitmasks. Unlike MSCSP it
+    does not reduce a constraint by another one it contains, leaving those
+    deductions to the exact solve, and it plays squares in a different
+    order, so the games (and the win rates of a run) differ. It records the
+    same (x, y) actions, so the GUI and the benchmark can use either solver.
+    """
+
+    def __init__(self, **kwargs):
+        self.board = kwargs.get("board")
+        self.rng = kwargs.get("rng", random)
+        self.record_actions = kwargs.get("record_actions", True)
+        self.profiler = kwargs.get("profiler")
+        self.cache = kwargs.get("cache")
+        self.patterns = kwargs.get("patterns")
+        self.budget = kwargs.get("budget")
+        x, y = self.board.starting_point
+        self.squares_to_probe = [x * self.board.cols + y]
+        # squares that have been uncovered by the solver
+        self.probed = 0
+        # uncovered numbered squares that still have unknown neighbors
+        self.active = set()
+        # active squares whose neighbors changed since they were last
+        # examined, as an ordered set
+        self.dirty = {}
+        # number of flagged and of unknown neighbors of every square
+        self.flag_counts = bytearray(self.board.size)
+        self.unknown_counts = bytearray(len(neighbors)
+                                        for neighbors in self.board.neighbors)
+        self.num_mines_flagged = 0
+        self.lost_game = False
+        self.num_guesses = 0
+        self.search_size = 0
+        self.pattern_hits = 0
+        self.actions = []
+        if self.profiler is not None:
+            self.profiler.instrument(self)
+
+    def won_game(self):
+        return not self.lost_game and self.board.is_solved()
+
+    def coordinates(self, i):
+        return divmod(i, self.board.cols)
+
+    def record_action(self, square, s):
+        if self.record_actions:
+            self.actions.append((self.coordinates(square), s))
+
+    def unknown_mask(self):
+        return self.board.full_mask & ~(self.probed | self.board.flagged)
+
+    def start_game(self):
+        while True:
+            while self.squares_to_probe:
+                square = self.squares_to_probe.pop()
+                if self.uncover_square(square):
+                    self.lost_game = True
+                    return
+                self.simplify_constraints()
+            if not self.unknown_mask():
+                return
+            self.search()
+
+    def uncover_square(self, square):
+        """
+        Uncovers square and, if it has no adjacent bombs, the whole zero
+        region around it. Returns True if square is a bomb.
+        """
+        board = self.board
+        bit = 1 << square
+        if self.probed & bit:
+            return
+        if board.mines & bit:
+            self.probed |= bit
+            self.record_action(square, "uncover")
+            return True
+        stack = [square]
+        self.probed |= bit
+        self.update_counts(square)
+        while stack:
+            i = stack.pop()
+            board.uncovered |= 1 << i
+            self.record_action(i, "uncover")
+            if board.numbers[i] == 0:
+                if not self.unknown_counts[i]:
+                    continue
+                for n in iter_bits(board.neighbor_mask(i) &
+                                   ~(self.probed | board.flagged)):
+                    self.probed |= 1 << n
+                    self.update_counts(n)
+                    stack.append(n)
+            elif self.unknown_counts[i]:
+                self.active.add(i)
+                self.dirty[i] = None
+
+    def mark_square_as_mine(self, square):
+        self.board.flagged |= 1 << square
+        self.num_mines_flagged += 1
+        self.update_counts(square, is_mine=True)
+        self.record_action(square, "flag")
+
+    def update_counts(self, square, is_mine=False):
+        """
+        Counts square, which was just probed or flagged, out of the unknown
+        neighbors of the squares around it, and queues the active ones to be
+        examined again.
+        """
+        for n in self.board.neighbors[square]:
+            self.unknown_counts[n] -= 1
+            if is_mine:
+                self.flag_counts[n] += 1
+            if n in self.active:
+                self.dirty[n] = None
+
+    def simplify_constraints(self):
+        """
+        Flags or probes the unknown neighbors of every active square whose
+        remaining mine count is 0 or equal to its number of unknown
+        neighbors, examining the squares whose neighbors changed until there
+        are none left or there are squares to probe.
+        """
+        board = self.board
+        dirty = self.dirty
+        while dirty and not self.squares_to_probe:
+            i = next(iter(dirty))
+            del dirty[i]
+            num_unknown = self.unknown_counts[i]
+            if not num_unknown:
+                self.active.discard(i)
+                continue
+            need = board.numbers[i] - self.flag_counts[i]
+            if need != 0 and need != num_unknown:
+                continue
+            self.active.discard(i)
+            unknown = board.neighbor_mask(i) & ~(self.probed |
+                                                  board.flagged)
+            if need == 0:
+                self.squares_to_probe.extend(iter_bits(unknown))
+            else:
+                for n in iter_bits(unknown):
+                    self.mark_square_as_mine(n)
+
+    def search(self):
+        """
+        Plays the forced squares of the pattern table, if any, or solves the
+        frontier exactly with solve_frontier and flags, probes or guesses in
+        the same way as MSCSP.search.
+        """
+        board = self.board
+        known = self.probed | board.flagged
+        constraints = []
+        frontier_mask = 0
+        for i in self.active:
+            if self.unknown_counts[i]:
+                unknown = board.neighbor_mask(i) & ~known
+                need = board.numbers[i] - self.flag_counts[i]
+                constraints.append((list(iter_bits(unknown)), need))
+                frontier_mask |= unknown
+        self.search_size = max(self.search_size, frontier_mask.bit_count())
+        if self.patterns is not None:
+            safe, mines = self.patterns.forced_moves(constraints,
+                                                     self.coordinates)
+            for square in mines:
+                self.mark_square_as_mine(square)
+            self.squares_to_probe.extend(safe)
+            if safe or mines:
+                self.pattern_hits += 1
+                return
+        if self.budget is not None:
+            self.budget.start()
+        mines_left = board.num_mines - self.num_mines_flagged
+        unknown_mask = self.unknown_mask()
+        interior = list_bits(unknown_mask & ~frontier_mask)
+
+        safe, mines, probabilities, interior_probability = solve_frontier(
+            constraints, mines_left, len(interior), self.profiler, self.cache,
+            self.coordinates, self.budget)
+        if interior_probability == 0:
+            safe.extend(interior)
+        elif interior_probability == 1:
+            mines.extend(interior)
+        for square in mines:
+            self.mark_square_as_mine(square)
+        self.squares_to_probe.extend(safe)
+        if safe or mines:
+            return
+
+        self.num_guesses += 1
+        candidates = interior
+        if probabilities:
+            best = min(probabilities, key=probabilities.get)
+            if not interior or probabilities[best] <= interior_probability:
+                self.squares_to_probe.append(best)
+                return
+        if not candidates:
+            candidates = list_bits(unknown_mask)
+        random_square = self.rng.randint(0, len(candidates)-1)
+        self.squares_to_probe.append(candidates[random_square])
@@ -0,0 +1,175 @@
+import random
+
+from neighbors import get_neighbor_table
+
+NUM_BOMBS = {"easy": 10, "medium": 40, "hard": 99}
+NUM_ROWS = {"easy": 9, "medium": 16, "hard": 16}
+NUM_COLS = {"easy": 9, "medium": 16, "hard": 30}
+
+
+def get_board_size(difficulty):
+    """
+    Returns (rows, cols, num_mines) for a difficulty name, or for a custom
+    board size given as "ROWSxCOLSxMINES", e.g. "1000x1000x100000".
+    Raises ValueError for anything else.
+    """
+    if difficulty in NUM_BOMBS:
+        return NUM_ROWS[difficulty], NUM_COLS[difficulty], NUM_BOMBS[difficulty]
+    try:
+        rows, cols, num_mines = (int(n) for n in difficulty.split("x"))
+    except ValueError:
+        raise ValueError(f"unknown difficulty or board size {difficulty!r}, "
+                         "expected easy, medium, hard or ROWSxCOLSxMINES")
+    if rows < 1 or cols < 1 or not 0 <= num_mines < rows * cols:
+        raise ValueError(f"invalid board size {difficulty!r}, a board needs at "
+                         "least one row, one column and one safe square")
+    return rows, cols, num_mines
+
+
+def to_print_tiles(ts):
+    """
+    Returns a list of tiles, but as (x, y) coordinate pairs rather than MSSquare
+    objects. Useful for printing tiles.
+    """
+    to_print = []
+    for t in ts:
+        to_print.append((t.row_number, t.col_number))
+    return to_print
+
+
+def get_adjacent_tiles(g, i, j):
+    """
+    Returns a list of all tiles in that are adjacent to the tile at index
+    (i, j) of grid g. g may be an MSBoard or any object with rows, cols and a
+    2D grid list.
+    """
+    table = get_neighbor_table(g.rows, g.cols)
+    ms_tiles = []
+    for n in table.neighbors[i * g.cols + j]:
+        x, y = divmod(n, g.cols)
+        ms_tiles.append(g.grid[x][y])
+    return ms_tiles
+
+
+def generate_bomb_positions(rows, cols, num_bombs, rng=random):
+    """
+    Returns a set of num_bombs distinct (row, col) bomb positions on a rows by
+    cols board, drawn with the random number generator rng.
+    """
+    bomb_positions = set()
+    while len(bomb_positions) < num_bombs:
+        rand_row = rng.randint(0, rows-1)
+        rand_col = rng.randint(0, cols-1)
+        bomb_positions.add((rand_row, rand_col))
+    return bomb_positions
+
+
+class MSSquare():
+    """
+    A single square of a Minesweeper board: its true contents (is_bomb,
+    adjacent_bombs) and whether it has been uncovered or flagged.
+    """
+
+    def __init__(self, row_number, col_number):
+        self.row_number = row_number
+        self.col_number = col_number
+        self.adjacent_bombs = 0
+        self.is_uncovered = False
+        self.is_flagged = False
+        self.is_bomb = False
+        self.adjacent_tiles = []
+
+
+class MSBoard():
+    """
+    Pure-Python Minesweeper board. This is the model that MSCSP solves on; the
+    Kivy MSGrid is only a view over it, so the solver can run without Kivy.
+    """
+
+    def __init__(self, rows, cols, num_mines):
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        self.grid = []
+        self.marked_squares = set()
+        self.starting_point = None
+        self.board_coordinates = []
+        self.mines_flagged = set()
+
+    def calculate_adjacent_bombs(self, bomb_positions):
+        """
+        Links every square to its adjacent squares and counts adjacent bombs by
+        walking the neighbors of each bomb only.
+        """
+        table = get_neighbor_table(self.rows, self.cols)
+        squares = [square for row in self.grid for square in row]
+        for i, square in enumerate(squares):
+            square.adjacent_tiles = [squares[n] for n in table.neighbors[i]]
+        for x, y in bomb_positions:
+            for n in table.neighbors[x * self.cols + y]:
+                squares[n].adjacent_bombs += 1
+
+    def create_layout(self, bomb_positions):
+        self.board_coordinates = self.get_coordinates()
+        self.grid = [[None for _ in range(self.cols)]
+                     for _ in range(self.rows)]
+        for i in range(self.rows):
+            for j in range(self.cols):
+                square = MSSquare(i, j)
+                if ((i, j) in bomb_positions):
+                    square.is_bomb = True
+                self.grid[i][j] = square
+
+        self.calculate_adjacent_bombs(bomb_positions)
+
+    def get_coordinates(self):
+        coords = []
+        for i in range(self.rows):
+            for j in range(self.cols):
+                if (i, j) != self.starting_point:
+                    coords.append((i, j))
+        return coords
+
+    def min_adj_bombs(self):
+        """
+        Returns the fewest adjacent bombs of any non-bomb square.
+        """
+        min_adj_bombs = 8
+        for i in range(self.rows):
+            for j in range(self.cols):
+                t = self.grid[i][j]
+                if not t.is_bomb and t.adjacent_bombs < min_adj_bombs:
+                    min_adj_bombs = t.adjacent_bombs
+        return min_adj_bombs
+
+    def uncover_first_non_bomb_tile(self):
+        """
+        Uncovers the first non-bomb square with the fewest adjacent bombs,
+        records it as the starting point and returns it.
+        """
+        mab = self.min_adj_bombs()
+        for i in range(self.rows):
+            for j in range(self.cols):
+                t = self.grid[i][j]
+                if not t.is_bomb and t.adjacent_bombs == mab:
+                    t.is_uncovered = True
+                    self.starting_point = (t.row_number, t.col_number)
+                    return t
+
+    def uncover_starting_point(self, x, y):
+        """
+        Uncovers square (x, y) as the starting point, as recorded from an
+        earlier game.
+        """
+        self.grid[x][y].is_uncovered = True
+        self.starting_point = (x, y)
+
+    def is_solved(self):
+        """
+        Returns True if every non-bomb square has been uncovered.
+        """
+        for row in self.grid:
+            for square in row:
+                if not square.is_bomb and not square.is_uncovered:
+                    return False
+        return True
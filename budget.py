@@ -0,0 +1,115 @@
+"""
+Search budgets.
+
+A SearchBudget bounds the work of one search, by wall-clock time, by the
+number of search states the frontier solver explores, or both. The frontier
+solver spends most of it as it counts, and gives up with BudgetExceeded once
+that share runs out; the components it could not count are then sampled
+within the rest of the budget, one state per square assigned, and the
+budget records that the answer of the search was not exact, with the
+largest standard error of the sampled probabilities. Node limits keep seeded
+games reproducible, while time limits give a bound on the latency of a move
+whatever the machine.
+"""
+import time
+
+# number of search states between two reads of the clock
+CLOCK_INTERVAL = 32
+
+# share of the budget of a search kept for sampling the components that
+# could not be counted in the rest
+SAMPLE_SHARE = 0.25
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class SearchBudget():
+    """
+    Time limit (seconds) and state limit (nodes) of each search, None for no
+    limit. start() is called at the beginning of every search, exact tells
+    whether the last search finished within the budget, and error is the
+    largest standard error of the probabilities it sampled, if any. Counting
+    may use all but SAMPLE_SHARE of the time limit, and of the state limit
+    if reserve() finds that share large enough, and sampling the rest.
+    vectorized is True to sample with NumPy rather than in pure Python.
+    """
+
+    def __init__(self, **kwargs):
+        self.seconds = kwargs.get("seconds")
+        self.nodes = kwargs.get("nodes")
+        self.vectorized = kwargs.get("vectorized", False)
+        self.deadline = None
+        self.count_deadline = None
+        self.count_nodes = self.nodes
+        self.used = 0
+        self.exact = True
+        self.error = None
+        # number of searches started and of searches that ran out, and the
+        # largest error of any search
+        self.searches = 0
+        self.exceeded = 0
+        self.max_error = None
+
+    def start(self):
+        if self.seconds is not None:
+            now = time.perf_counter()
+            self.deadline = now + self.seconds
+            self.count_deadline = now + self.seconds * (1 - SAMPLE_SHARE)
+        self.count_nodes = self.nodes
+        self.used = 0
+        self.exact = True
+        self.error = None
+        self.searches += 1
+
+    def spend(self, n=1):
+        """
+        Counts n search states. Raises BudgetExceeded if the counting share
+        of the budget of the current search has run out.
+        """
+        if not self.exact:
+            raise BudgetExceeded()
+        used = self.used + n
+        self.used = used
+        if self.count_nodes is not None and used > self.count_nodes:
+            self.exhaust()
+        if self.count_deadline is not None and \
+                used // CLOCK_INTERVAL != (used - n) // CLOCK_INTERVAL and \
+                time.perf_counter() > self.count_deadline:
+            self.exhaust()
+
+    def reserve(self, nodes):
+        """
+        Keeps SAMPLE_SHARE of the state limit of the current search for
+        sampling if that share is at least nodes states, and leaves it all
+        to counting otherwise.
+        """
+        if self.nodes is not None:
+            self.count_nodes = self.nodes
+            if self.nodes * SAMPLE_SHARE >= nodes:
+                self.count_nodes = int(self.nodes * (1 - SAMPLE_SHARE))
+
+    def draws(self, size, cost):
+        """
+        Spends up to size sampled draws of cost states each from the budget
+        of the current search, and returns how many of them fit, 0 once the
+        budget has run out.
+        """
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            return 0
+        if self.nodes is not None:
+            size = min(size, max(self.nodes - self.used, 0) // max(cost, 1))
+        self.used += size * cost
+        return size
+
+    def record_error(self, error):
+        self.error = error if self.error is None else max(self.error, error)
+        if self.max_error is None or error > self.max_error:
+            self.max_error = error
+
+    def exhaust(self):
+        if self.exact:
+            self.exact = False
+            self.exceeded += 1
+        raise BudgetExceeded()
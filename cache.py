@@ -0,0 +1,165 @@
+"""
+Cache of solved frontier components.
+
+The solution counts of a component only depend on which of its squares each
+constraint covers and on the constants, not on where the component is. A
+component is encoded by numbering its squares in sorted order of their
+coordinates, relative to the component's corner, under each of the 8
+rotations and reflections of the board, and keeping the smallest encoding,
+so translated, rotated and mirrored copies of a pattern share one entry.
+Entries hold the counts in that canonical numbering and are evicted least
+recently used first once there are too many or they take too much memory.
+"""
+import sys
+from collections import OrderedDict
+
+from frontier import enumerate_component
+
+# default limits of a ComponentCache
+CACHE_ENTRIES = 20000
+CACHE_BYTES = 64 * 1024 * 1024
+
+# components with fewer squares are cheaper to solve than to encode
+MIN_CACHED_CELLS = 8
+
+# the 8 symmetries of the square grid
+SYMMETRIES = [
+    lambda x, y: (x, y),
+    lambda x, y: (x, -y),
+    lambda x, y: (-x, y),
+    lambda x, y: (-x, -y),
+    lambda x, y: (y, x),
+    lambda x, y: (y, -x),
+    lambda x, y: (-y, x),
+    lambda x, y: (-y, -x)
+]
+
+
+def canonical_form(cells, constraints, position=None):
+    """
+    Returns (key, labels): the canonical encoding of a component and, for
+    each square of cells, its number in that encoding. position maps a
+    square to its (row, col) coordinates; squares are coordinates if it is
+    None.
+    """
+    index = {cell: i for i, cell in enumerate(cells)}
+    points = [position(cell) for cell in cells] if position else cells
+    best_key = None
+    best_labels = None
+    for symmetry in SYMMETRIES:
+        moved = [symmetry(x, y) for x, y in points]
+        order = sorted(range(len(cells)), key=moved.__getitem__)
+        labels = [0] * len(cells)
+        for label, i in enumerate(order):
+            labels[i] = label
+        key = tuple(sorted((tuple(sorted(labels[index[cell]] for cell in cs)),
+                            count) for cs, count in constraints))
+        if best_key is None or key < best_key:
+            best_key = key
+            best_labels = labels
+    return (len(cells), best_key), best_labels
+
+
+def deep_size(obj):
+    """
+    Returns the approximate memory taken by obj and the containers and
+    numbers it holds, in bytes.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_size(key) + deep_size(value)
+    elif isinstance(obj, (tuple, list)):
+        for item in obj:
+            size += deep_size(item)
+    return size
+
+
+class ComponentCache():
+    """
+    LRU cache of enumerate_component results, shared by the decisions of a
+    game and by the games of a process. Keeps at most max_entries entries
+    taking about max_bytes bytes in total, and counts hits, misses and
+    evictions.
+    """
+
+    def __init__(self, **kwargs):
+        self.max_entries = kwargs.get("max_entries", CACHE_ENTRIES)
+        self.max_bytes = kwargs.get("max_bytes", CACHE_BYTES)
+        # key -> (solution_counts, mine_counts in canonical numbering, bytes)
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def enumerate_component(self, cells, constraints, max_mines,
+                            profiler=None, position=None, budget=None):
+        """
+        Same as frontier.enumerate_component, answered from the cache when an
+        equivalent component was solved before. position is passed to
+        canonical_form.
+        """
+        if len(cells) < MIN_CACHED_CELLS:
+            return enumerate_component(cells, constraints, max_mines,
+                                       profiler, budget)
+        key, labels = canonical_form(cells, constraints, position)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            solution_counts, canonical_counts, _ = entry
+            solution_counts = dict(solution_counts)
+            mine_counts = {k: [counts[label] for label in labels]
+                           for k, counts in canonical_counts.items()}
+        else:
+            self.misses += 1
+            # solved in the given order, which keeps constraints together
+            solution_counts, mine_counts = enumerate_component(
+                cells, constraints, len(cells), profiler, budget)
+            canonical_counts = {}
+            for k, counts in mine_counts.items():
+                canonical = [0] * len(cells)
+                for i, label in enumerate(labels):
+                    canonical[label] = counts[i]
+                canonical_counts[k] = tuple(canonical)
+            self.add(key, solution_counts, canonical_counts)
+        if max(solution_counts, default=0) > max_mines:
+            solution_counts = {k: n for k, n in solution_counts.items()
+                               if k <= max_mines}
+            mine_counts = {k: mine_counts[k] for k in solution_counts}
+        return solution_counts, mine_counts
+
+    def add(self, key, solution_counts, canonical_counts):
+        size = deep_size(key) + deep_size(solution_counts) + \
+            deep_size(canonical_counts)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (solution_counts, canonical_counts, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or \
+                self.bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """
+        Returns a dictionary with the number of entries, their approximate
+        size in bytes, the hits, misses and evictions and the hit rate.
+        """
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate()
+        }
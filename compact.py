@@ -0,0 +1,322 @@
+"""
+Compact Minesweeper backend for very large boards.
+
+The board takes one byte per square: the low four bits hold the number of
+adjacent bombs and the high bits flag mines, uncovered squares and flags.
+Neighbors are computed arithmetically instead of from a NeighborTable, whose
+tuples would cost far more than the board itself. The solver only ever looks
+at the revealed area and its frontier, and re-solves only the frontier
+components that changed, so its work grows with the revealed area rather
+than with the board. Its memory grows with the frontier, at about 1 KB per
+constraint, and the mine layout is only needed while the board is set up.
+"""
+from heapq import heappop, heappush
+
+from constraints import ConstraintStore
+from csp import MSCSP
+from frontier import solve_component
+
+NUMBER_MASK = 0x0F
+MINE = 0x10
+UNCOVERED = 0x20
+FLAGGED = 0x40
+
+
+class CompactBoard():
+    """
+    Minesweeper board stored in a bytearray, with one byte per square in
+    row-major order. Offers the same setup methods as MSBoard.
+    """
+
+    def __init__(self, rows, cols, num_mines):
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        self.size = rows * cols
+        self.cells = bytearray(self.size)
+        self.num_uncovered = 0
+        self.num_flagged = 0
+        self.starting_point = None
+
+    def neighbors(self, i):
+        """
+        Returns the indices of the squares adjacent to square i.
+        """
+        cols = self.cols
+        x, y = divmod(i, cols)
+        neighbors = []
+        for nx in (x - 1, x, x + 1):
+            if 0 <= nx < self.rows:
+                for ny in (y - 1, y, y + 1):
+                    if 0 <= ny < cols and (nx != x or ny != y):
+                        neighbors.append(nx * cols + ny)
+        return neighbors
+
+    def create_layout(self, bomb_positions):
+        cells = self.cells
+        for x, y in bomb_positions:
+            i = x * self.cols + y
+            cells[i] |= MINE
+            for n in self.neighbors(i):
+                cells[n] += 1
+
+    def uncover_first_non_bomb_tile(self):
+        """
+        Uncovers the first non-bomb square with the fewest adjacent bombs,
+        records it as the starting point and returns its index.
+        """
+        cells = self.cells
+        mab = min(c & NUMBER_MASK for c in cells if not c & MINE)
+        for i in range(self.size):
+            if not cells[i] & MINE and cells[i] & NUMBER_MASK == mab:
+                self.uncover(i)
+                self.starting_point = divmod(i, self.cols)
+                return i
+
+    def uncover_starting_point(self, x, y):
+        self.uncover(x * self.cols + y)
+        self.starting_point = (x, y)
+
+    def uncover(self, i):
+        if not self.cells[i] & UNCOVERED:
+            self.cells[i] |= UNCOVERED
+            self.num_uncovered += 1
+
+    def flag(self, i):
+        if not self.cells[i] & FLAGGED:
+            self.cells[i] |= FLAGGED
+            self.num_flagged += 1
+
+    def is_unknown(self, i):
+        return not self.cells[i] & (UNCOVERED | FLAGGED)
+
+    def num_unknown(self):
+        return self.size - self.num_uncovered - self.num_flagged
+
+    def is_solved(self):
+        """
+        Returns True if every non-bomb square has been uncovered.
+        """
+        return self.num_uncovered == self.size - self.num_mines
+
+
+class CompactSolver(MSCSP):
+    """
+    MSCSP on a CompactBoard. Squares are board indices, zero regions are
+    opened with a stack rather than by recursion, and search() only re-solves
+    the frontier components touched since the previous call. Components are
+    solved on their own with solve_component, and the lowest probabilities
+    are kept in a heap, so a guess does not rescan the frontier.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # mine probability of every frontier square, with a heap of
+        # (probability, square) entries that may be out of date
+        self.probabilities = {}
+        self.probability_heap = []
+        # components are re-solved only when their constraints change
+        self.store = ConstraintStore(track_changes=True)
+        # the board has already uncovered the starting square, so only its
+        # region is left to open
+        x, y = self.board.starting_point
+        start = x * self.board.cols + y
+        self.squares_to_probe = []
+        self.record_action(start, "uncover")
+        self.open_region(start)
+
+    def won_game(self):
+        return not self.lost_game and self.board.is_solved()
+
+    def coordinates(self, i):
+        return divmod(i, self.board.cols)
+
+    def record_action(self, square, s):
+        if self.record_actions:
+            self.actions.append((self.coordinates(square), s))
+
+    def start_game(self):
+        # constraints from the starting region
+        self.simplify_constraints()
+        while True:
+            while self.squares_to_probe:
+                square = self.squares_to_probe.pop()
+                uncovered = self.uncover_square(square)
+                if uncovered == True:
+                    self.lost_game = True
+                    return
+                self.simplify_constraints()
+            if not self.board.num_unknown():
+                return
+            self.search()
+
+    def uncover_square(self, square):
+        """
+        Uncovers square and, if it has no adjacent bombs, the whole zero
+        region around it. Returns True if square is a bomb.
+        """
+        board = self.board
+        cells = board.cells
+        if cells[square] & (UNCOVERED | FLAGGED):
+            return
+        if cells[square] & MINE:
+            board.uncover(square)
+            self.record_action(square, "uncover")
+            return True
+        self.mark_square_as_safe(square)
+        self.open_region(square)
+
+    def open_region(self, square):
+        """
+        Opens the zero region around the uncovered square, and adds a
+        constraint for every numbered square on its border.
+        """
+        board = self.board
+        cells = board.cells
+        stack = [square]
+        while stack:
+            i = stack.pop()
+            number = cells[i] & NUMBER_MASK
+            if number == 0:
+                for n in board.neighbors(i):
+                    if not cells[n] & (UNCOVERED | FLAGGED):
+                        self.mark_square_as_safe(n)
+                        stack.append(n)
+            else:
+                unknown = []
+                mines = 0
+                for n in board.neighbors(i):
+                    if cells[n] & FLAGGED:
+                        mines += 1
+                    elif not cells[n] & UNCOVERED:
+                        unknown.append(n)
+                self.store.add(unknown, number - mines)
+
+    def mark_square_as_safe(self, square):
+        self.board.uncover(square)
+        self.probabilities.pop(square, None)
+        self.store.mark(square, False)
+        self.record_action(square, "uncover")
+
+    def mark_square_as_mine(self, square):
+        if not self.board.is_unknown(square):
+            return
+        self.board.flag(square)
+        self.num_mines_flagged += 1
+        self.probabilities.pop(square, None)
+        self.store.mark(square, True)
+        self.record_action(square, "flag")
+
+    def changed_components(self):
+        """
+        Yields (cells, constraints) for every frontier component that holds a
+        constraint changed since the previous call.
+        """
+        store = self.store
+        seen = set()
+        for start in store.pop_changed():
+            if start in seen:
+                continue
+            seen.add(start)
+            cells = []
+            constraints = []
+            cell_seen = set()
+            queue = [start]
+            i = 0
+            while i < len(queue):
+                c = queue[i]
+                i += 1
+                constraints.append((list(c.squares), c.constant))
+                for square in c.squares:
+                    if square in cell_seen:
+                        continue
+                    cell_seen.add(square)
+                    cells.append(square)
+                    for other in store.by_square[square]:
+                        if other not in seen:
+                            seen.add(other)
+                            queue.append(other)
+            yield cells, constraints
+
+    def pick_interior_square(self):
+        """
+        Returns a random unknown square that is not on the frontier, or None
+        if there is none.
+        """
+        board = self.board
+        for _ in range(64):
+            i = self.rng.randrange(board.size)
+            if board.is_unknown(i) and i not in self.store.by_square:
+                return i
+        for i in range(board.size):
+            if board.is_unknown(i) and i not in self.store.by_square:
+                return i
+        return None
+
+    def search(self):
+        """
+        Re-solves the changed frontier components, then flags, probes or
+        guesses in the same way as MSCSP.search, comparing the frontier
+        against the density of the remaining unknown squares. Components
+        with forced squares in the pattern table are played without being
+        solved, and components estimated because the budget ran out keep
+        their estimates until one of their constraints changes.
+        """
+        board = self.board
+        mines_left = board.num_mines - self.num_mines_flagged
+        num_unknown = board.num_unknown()
+        if mines_left == 0 or mines_left == num_unknown:
+            for i in range(board.size):
+                if board.is_unknown(i):
+                    if mines_left:
+                        self.mark_square_as_mine(i)
+                    else:
+                        self.squares_to_probe.append(i)
+            return
+        density = mines_left / num_unknown
+        if self.budget is not None:
+            self.budget.start()
+
+        found = False
+        patterns = self.patterns
+        for cells, constraints in self.changed_components():
+            self.search_size = max(self.search_size, len(cells))
+            if patterns is not None:
+                safe, mines = patterns.component_moves(cells, constraints,
+                                                       self.coordinates)
+                if safe or mines:
+                    for square in mines:
+                        self.mark_square_as_mine(square)
+                    self.squares_to_probe.extend(safe)
+                    self.pattern_hits += 1
+                    found = True
+                    continue
+            safe, mines, probabilities = solve_component(
+                cells, constraints, mines_left, density, self.profiler,
+                self.cache, self.coordinates, self.budget)
+            for square in mines:
+                self.mark_square_as_mine(square)
+            self.squares_to_probe.extend(safe)
+            found = found or bool(safe or mines)
+            for square, p in probabilities.items():
+                if board.is_unknown(square):
+                    self.probabilities[square] = p
+                    heappush(self.probability_heap, (p, square))
+        if found:
+            return
+
+        self.num_guesses += 1
+        heap = self.probability_heap
+        while heap and self.probabilities.get(heap[0][1]) != heap[0][0]:
+            heappop(heap)
+        if heap and heap[0][0] <= density:
+            self.squares_to_probe.append(heap[0][1])
+            return
+        square = self.pick_interior_square()
+        if square is None and heap:
+            square = heap[0][1]
+        elif square is None:
+            # only squares of inconsistent components are left
+            square = next(i for i in range(board.size)
+                          if board.is_unknown(i))
+        self.squares_to_probe.append(square)
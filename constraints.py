@@ -0,0 +1,140 @@
+"""
+Incremental constraint store for the Minesweeper CSP.
+
+A constraint says that exactly constant of its unknown squares are mines. The
+store indexes constraints by the squares they touch, so flagging or
+uncovering a square only updates the constraints around it, and only those
+constraints are re-examined by the solver. Dictionaries are used as ordered
+sets so that the solver is deterministic for a given seed.
+"""
+from collections import OrderedDict
+
+
+class MSConstraint():
+    """
+    Exactly constant of the squares in squares are mines.
+    """
+    __slots__ = ("squares", "constant")
+
+    def __init__(self, squares, constant):
+        self.squares = set(squares)
+        self.constant = constant
+
+
+class ConstraintStore():
+    """
+    The constraints of a game, indexed by square. Every constraint that
+    changes is queued in dirty until the solver pops it. If track_changes is
+    True, it is also kept in changed until pop_changed is called, so that a
+    solver can redo work only for the parts of the frontier that changed.
+    """
+
+    def __init__(self, **kwargs):
+        self.constraints = {}
+        self.by_square = {}
+        # popped from the front, which an OrderedDict does in constant time
+        self.dirty = OrderedDict()
+        self.track_changes = kwargs.get("track_changes", False)
+        self.changed = {}
+
+    def __len__(self):
+        return len(self.constraints)
+
+    def __iter__(self):
+        return iter(self.constraints)
+
+    def add(self, squares, constant):
+        """
+        Adds a constraint over squares and returns it, or None if squares is
+        empty.
+        """
+        if not squares:
+            return None
+        c = MSConstraint(squares, constant)
+        self.constraints[c] = None
+        for square in c.squares:
+            if square not in self.by_square:
+                self.by_square[square] = {}
+            self.by_square[square][c] = None
+        self.queue(c)
+        return c
+
+    def remove(self, c):
+        if c not in self.constraints:
+            return
+        del self.constraints[c]
+        self.dirty.pop(c, None)
+        self.changed.pop(c, None)
+        for square in c.squares:
+            self.unindex(square, c)
+
+    def unindex(self, square, c):
+        """
+        Removes c from the constraints of square, and square from the index
+        once none are left.
+        """
+        constraints = self.by_square[square]
+        constraints.pop(c, None)
+        if not constraints:
+            del self.by_square[square]
+
+    def queue(self, c):
+        """
+        Queues the changed constraint c in dirty, and in changed if changes
+        are tracked.
+        """
+        self.dirty[c] = None
+        if self.track_changes:
+            self.changed[c] = None
+
+    def mark(self, square, is_mine):
+        """
+        Removes square from every constraint that contains it, lowering the
+        constant of each if square is a mine.
+        """
+        for c in self.by_square.pop(square, {}):
+            c.squares.discard(square)
+            if is_mine:
+                c.constant -= 1
+            self.queue(c)
+
+    def reduce(self, c, subset):
+        """
+        Replaces c by c minus subset, whose squares must all be in c.
+        """
+        for square in subset.squares:
+            c.squares.discard(square)
+            self.unindex(square, c)
+        c.constant -= subset.constant
+        self.queue(c)
+
+    def pop_dirty(self):
+        """
+        Returns the oldest changed constraint that is still in the store, or
+        None once there are none left.
+        """
+        while self.dirty:
+            c, _ = self.dirty.popitem(last=False)
+            if c in self.constraints:
+                return c
+        return None
+
+    def pop_changed(self):
+        """
+        Returns the constraints still in the store that changed since the
+        last call. Only tracked if the store was created with track_changes.
+        """
+        changed = [c for c in self.changed if c in self.constraints]
+        self.changed = {}
+        return changed
+
+    def neighbors(self, c):
+        """
+        Returns the other constraints that share a square with c.
+        """
+        others = {}
+        for square in c.squares:
+            for other in self.by_square.get(square, ()):
+                if other is not c:
+                    others[other] = None
+        return others
@@ -0,0 +1,305 @@
+import random
+
+from constraints import ConstraintStore
+from frontier import solve_frontier
+
+
+class MSCSP():
+    """
+    Minesweeper Constraint Satisfaction Problem.
+
+    Runs entirely on an MSBoard, so it can be used headlessly without Kivy. The
+    GUI replays the recorded actions afterwards.
+
+    Source code adapted from Christina Levengood's Minesweeper Solver:
+    https://github.com/lvngd/minesweeper/blob/master/minesweeper_ai.py
+
+    Explanation:
+    https://lvngd.com/blog/solving-minesweeper-python-constraint-satisfaction-problem/
+    """
+
+    def __init__(self, **kwargs):
+        self.board = kwargs.get("board")
+        self.rng = kwargs.get("rng", random)
+        self.record_actions = kwargs.get("record_actions", True)
+        # profiling.Profiler that times the solver phases, if any
+        self.profiler = kwargs.get("profiler")
+        # cache.ComponentCache of solved frontier components, if any
+        self.cache = kwargs.get("cache")
+        # patterns.PatternTable of forced moves consulted before solving the
+        # frontier, if any
+        self.patterns = kwargs.get("patterns")
+        # budget.SearchBudget bounding each search, if any
+        self.budget = kwargs.get("budget")
+        self.num_mines_flagged = 0
+        self.squares_to_probe = [self.board.starting_point]
+        self.probed_squares = set()
+        self.marked_count = {}
+        self.path_uncovered = []
+        self.lost_game = False
+        self.store = ConstraintStore()
+        self.num_guesses = 0
+        # largest number of frontier squares handed to search()
+        self.search_size = 0
+        # number of searches answered by the pattern table
+        self.pattern_hits = 0
+
+        # actions[i] is a tuple (sq, s) where sq is the (x, y) coordinate of a
+        # square, and s is either "flag" or "uncover", in the order the solver
+        # performed them. Only kept if record_actions is True.
+        self.actions = []
+        if self.profiler is not None:
+            self.profiler.instrument(self)
+
+    def print_actions(self):
+        to_print = []
+        for i in range(len(self.actions)):
+            (x, y), s = self.actions[i]
+            to_print.append((x, y, s))
+        print(to_print)
+
+    def print_grid(self):
+        for i in range(self.board.rows):
+            for j in range(self.board.cols):
+                sq = self.get_current_square(i, j)
+                print(
+                    f"{(i, j)}, flagged = {sq.is_flagged}, uncovered = {sq.is_uncovered}, is bomb = {sq.is_bomb}")
+
+    def won_game(self):
+        return not self.lost_game and self.board.is_solved()
+
+    def get_unknown_squares(self):
+        """
+        Returns the set of squares that have been neither uncovered nor
+        flagged.
+        """
+        return set(self.board.board_coordinates) - self.board.marked_squares
+
+    def start_game(self):
+        while self.step():
+            pass
+
+    def step(self):
+        """
+        Plays one move: probes the next square to probe, or searches if
+        there is none. Returns False once the game is over, so the game can
+        be played a few moves at a time.
+        """
+        if self.squares_to_probe:
+            square = self.squares_to_probe.pop()
+            uncovered = self.uncover_square(square)
+            if uncovered == True:
+                self.lost_game = True
+                return False
+            self.simplify_constraints()
+            return True
+        if not self.get_unknown_squares():
+            return False
+        self.search()
+        return True
+
+    def uncover_square(self, square):
+        """
+        Uncovers square and, if it has no adjacent bombs, the whole zero
+        region around it in one pass. Returns True if square is a bomb,
+        otherwise the list of squares uncovered, in the order they were
+        reached.
+        """
+        if square in self.probed_squares:
+            return []
+        x, y = square
+        current = self.get_current_square(x, y)
+        if current.is_bomb:
+            self.probed_squares.add(square)
+            self.path_uncovered.append((square, 'uncovered'))
+            current.is_uncovered = True
+            if self.record_actions:
+                self.actions.append((square, "uncover"))
+            return True
+        revealed = self.reveal_region(current)
+        self.mark_squares_as_safe(revealed)
+        return revealed
+
+    def reveal_region(self, current):
+        """
+        Uncovers the non-bomb square current and, breadth first, the zero
+        region around it. Returns the uncovered squares as (x, y) pairs.
+        """
+        probed = self.probed_squares
+        marked = self.board.marked_squares
+        square = (current.row_number, current.col_number)
+        probed.add(square)
+        current.is_uncovered = True
+        revealed = [square]
+        i = 0
+        while i < len(revealed):
+            x, y = revealed[i]
+            i += 1
+            tile = self.get_current_square(x, y)
+            if tile.adjacent_bombs != 0:
+                continue
+            for neighbor in tile.adjacent_tiles:
+                n = (neighbor.row_number, neighbor.col_number)
+                if n not in probed and n not in marked:
+                    probed.add(n)
+                    neighbor.is_uncovered = True
+                    revealed.append(n)
+        return revealed
+
+    def mark_squares_as_safe(self, squares):
+        """
+        Marks a batch of uncovered squares as safe, then adds one constraint
+        for every numbered square among them, once the whole batch is known.
+        """
+        self.path_uncovered.extend((square, 'uncovered') for square in squares)
+        for square in squares:
+            self.mark_square(square)
+        if self.record_actions:
+            self.actions.extend((square, "uncover") for square in squares)
+        flagged = self.board.mines_flagged
+        marked = self.board.marked_squares
+        for x, y in squares:
+            current = self.get_current_square(x, y)
+            if current.adjacent_bombs == 0:
+                continue
+            unknown = []
+            mines = 0
+            for neighbor in current.adjacent_tiles:
+                n = (neighbor.row_number, neighbor.col_number)
+                if n in flagged:
+                    mines += 1
+                elif n not in marked:
+                    unknown.append(n)
+            self.store.add(unknown, current.adjacent_bombs - mines)
+
+    def search(self):
+        """
+        Computes the exact mine probability of every unknown square. Squares
+        that cannot be mines are probed and squares that must be mines are
+        flagged. If there are neither, the square with the lowest mine
+        probability is probed. Forced squares found in the pattern table are
+        played without solving the frontier. If the budget runs out, the
+        probabilities are estimates (see solve_frontier).
+        """
+        constraints = []
+        frontier = set()
+        for c in self.store:
+            constraints.append((list(c.squares), c.constant))
+            frontier.update(c.squares)
+        self.search_size = max(self.search_size, len(frontier))
+        if self.patterns is not None and self.play_patterns(constraints):
+            return
+        if self.budget is not None:
+            self.budget.start()
+        mines_left = self.board.num_mines - self.num_mines_flagged
+        unknown = self.get_unknown_squares()
+        interior = sorted(unknown - frontier)
+
+        safe, mines, probabilities, interior_probability = self.solve(
+            constraints, mines_left, len(interior))
+        if interior_probability == 0:
+            safe.extend(interior)
+        elif interior_probability == 1:
+            mines.extend(interior)
+        for square in mines:
+            self.mark_square_as_mine(square)
+        for square in safe:
+            self.squares_to_probe.append(square)
+        if safe or mines:
+            return
+
+        self.num_guesses += 1
+        candidates = interior
+        if probabilities:
+            best = min(probabilities, key=probabilities.get)
+            if not interior or probabilities[best] <= interior_probability:
+                self.squares_to_probe.append(best)
+                return
+        if not candidates:
+            candidates = sorted(unknown)
+        random_square = self.rng.randint(0, len(candidates)-1)
+        self.squares_to_probe.append(candidates[random_square])
+
+    def solve(self, constraints, mines_left, num_interior):
+        """
+        Returns solve_frontier(constraints, mines_left, num_interior), with
+        the profiler, cache and budget of the solver.
+        """
+        return solve_frontier(constraints, mines_left, num_interior,
+                              self.profiler, self.cache, budget=self.budget)
+
+    def play_patterns(self, constraints, position=None):
+        """
+        Flags and probes the squares that the pattern table knows to be
+        forced. Returns True if there were any.
+        """
+        safe, mines = self.patterns.forced_moves(constraints, position)
+        for square in mines:
+            self.mark_square_as_mine(square)
+        self.squares_to_probe.extend(safe)
+        if safe or mines:
+            self.pattern_hits += 1
+            return True
+        return False
+
+    def simplify_constraints(self):
+        """
+        Re-examines the constraints that changed since the last call. A
+        constraint with no mines left has its squares probed, one with as
+        many mines as squares has them flagged, and one that contains
+        another constraint is reduced by it.
+        """
+        store = self.store
+        c = store.pop_dirty()
+        while c is not None:
+            if c.constant == 0:
+                store.remove(c)
+                self.squares_to_probe.extend(c.squares)
+            elif c.constant == len(c.squares):
+                store.remove(c)
+                for square in list(c.squares):
+                    self.mark_square_as_mine(square)
+            else:
+                for other in store.neighbors(c):
+                    if c.squares <= other.squares:
+                        store.reduce(other, c)
+                    elif other.squares <= c.squares:
+                        # c changed and is examined again
+                        store.reduce(c, other)
+                        break
+            c = store.pop_dirty()
+        return
+
+    def mark_square_as_safe(self, square):
+        self.mark_square(square)
+        if self.record_actions:
+            self.actions.append((square, "uncover"))
+        return
+
+    def mark_square_as_mine(self, square):
+        if square in self.board.marked_squares:
+            return
+        self.path_uncovered.append((square, 'flagged'))
+        self.num_mines_flagged += 1
+        self.board.mines_flagged.add(square)
+        self.mark_square(square, is_mine=True)
+        if self.record_actions:
+            self.actions.append((square, "flag"))
+        return
+
+    def mark_square(self, square, is_mine=False):
+        x, y = square
+        if (x, y) not in self.marked_count:
+            self.marked_count[(x, y)] = 1
+        else:
+            self.marked_count[(x, y)] += 1
+        if square in self.board.marked_squares:
+            return
+        self.board.marked_squares.add(square)
+        if is_mine:
+            self.get_current_square(x, y).is_flagged = True
+        self.store.mark(square, is_mine)
+        return
+
+    def get_current_square(self, x, y):
+        return self.board.grid[x][y]
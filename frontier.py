@@ -0,0 +1,389 @@
+"""
+Frontier solving for the Minesweeper CSP.
+
+A frontier is described by a list of constraints, each a (cells, count) pair
+meaning that exactly count of the unknown squares in cells are mines. The
+frontier is split into independent components of squares that share
+constraints, and each component is enumerated on its own with pruning.
+"""
+from functools import lru_cache
+from math import comb, exp, log
+
+from budget import BudgetExceeded
+from sampler import MIN_SAMPLES, sample_component
+
+
+def get_components(constraints):
+    """
+    Splits constraints into independent components. Returns a list of
+    (cells, constraints) pairs, where cells lists the squares of the component
+    in breadth-first order, so that squares sharing a constraint are close
+    together, and constraints are the constraints over those squares.
+    """
+    cell_constraints = {}
+    for c in constraints:
+        for cell in c[0]:
+            if cell not in cell_constraints:
+                cell_constraints[cell] = [c]
+            else:
+                cell_constraints[cell].append(c)
+
+    components = []
+    visited = set()
+    for start in cell_constraints:
+        if start in visited:
+            continue
+        visited.add(start)
+        cells = [start]
+        component_constraints = []
+        seen_constraints = set()
+        i = 0
+        while i < len(cells):
+            for c in cell_constraints[cells[i]]:
+                if id(c) in seen_constraints:
+                    continue
+                seen_constraints.add(id(c))
+                component_constraints.append(c)
+                for cell in c[0]:
+                    if cell not in visited:
+                        visited.add(cell)
+                        cells.append(cell)
+            i += 1
+        components.append((cells, component_constraints))
+    return components
+
+
+def enumerate_component(cells, constraints, max_mines, profiler=None,
+                        budget=None):
+    """
+    Counts every assignment of mines to cells that satisfies constraints and
+    uses at most max_mines mines. Each constraint is checked as soon as one of
+    its squares is assigned, so dead branches are cut early. Squares are
+    assigned in order, and the count for the squares from v onwards only
+    depends on the mines still needed by the constraints that are partly
+    assigned at v, so those counts are memoized rather than every solution
+    being visited.
+
+    Returns (solution_counts, mine_counts), where solution_counts[k] is the
+    number of solutions with k mines and mine_counts[k][i] is the number of
+    those solutions in which cells[i] is a mine. If a profiler is given, the
+    component, the memoized states and the solutions are counted in it. If a
+    budget.SearchBudget is given, every memoized state is spent from it, and
+    BudgetExceeded is raised once it runs out.
+    """
+    index = {cell: i for i, cell in enumerate(cells)}
+    var_constraints = [[] for _ in cells]
+    remaining = []
+    unassigned = []
+    first = []
+    last = []
+    for ci, (cs, count) in enumerate(constraints):
+        positions = [index[cell] for cell in cs]
+        for p in positions:
+            var_constraints[p].append(ci)
+        remaining.append(count)
+        unassigned.append(len(cs))
+        first.append(min(positions))
+        last.append(max(positions))
+
+    n = len(cells)
+    # open_constraints[v] are the constraints with squares both before and
+    # from v onwards
+    open_constraints = [[] for _ in range(n + 1)]
+    for ci in range(len(constraints)):
+        for v in range(first[ci] + 1, last[ci] + 1):
+            open_constraints[v].append(ci)
+
+    memo = {}
+
+    def count(v):
+        # returns {k: (solutions, [mine counts of cells v..n-1])}
+        if v == n:
+            return {0: (1, [])}
+        key = (v, tuple(remaining[c] for c in open_constraints[v]))
+        if key in memo:
+            return memo[key]
+        if budget is not None:
+            budget.spend()
+        result = {}
+        vcs = var_constraints[v]
+        for val in (0, 1):
+            valid = True
+            for c in vcs:
+                unassigned[c] -= 1
+                remaining[c] -= val
+                if remaining[c] < 0 or remaining[c] > unassigned[c]:
+                    valid = False
+            if valid:
+                for k, (solutions, counts) in count(v + 1).items():
+                    k += val
+                    counts = [solutions if val else 0] + counts
+                    if k not in result:
+                        result[k] = (solutions, counts)
+                    else:
+                        total, total_counts = result[k]
+                        result[k] = (total + solutions,
+                                     [x + y for x, y in zip(total_counts,
+                                                            counts)])
+            for c in vcs:
+                unassigned[c] += 1
+                remaining[c] += val
+        memo[key] = result
+        return result
+
+    solution_counts = {}
+    mine_counts = {}
+    for k, (solutions, counts) in count(0).items():
+        if k <= max_mines:
+            solution_counts[k] = solutions
+            mine_counts[k] = counts
+    if profiler is not None:
+        profiler.count("components")
+        profiler.count("search nodes", len(memo))
+        profiler.count("solutions", sum(solution_counts.values()))
+    return solution_counts, mine_counts
+
+
+def count_component(cells, constraints, max_mines, profiler=None,
+                    cache=None, position=None, budget=None):
+    """
+    Returns enumerate_component(cells, constraints, max_mines), from cache if
+    a cache.ComponentCache is given. position maps a square to its (row, col)
+    coordinates, for squares that are not coordinates themselves. A budget
+    keeps part of its state limit for sampling the component if that part
+    pays for MIN_SAMPLES draws of it.
+    """
+    if budget is not None:
+        budget.reserve(len(cells) * MIN_SAMPLES)
+    if cache is None:
+        return enumerate_component(cells, constraints, max_mines, profiler,
+                                   budget)
+    return cache.enumerate_component(cells, constraints, max_mines, profiler,
+                                     position, budget)
+
+
+def sample_probabilities(cells, constraints, density, budget=None):
+    """
+    Estimates the mine probability of every square of a component that was
+    too large to count with sampler.sample_component, with the squares
+    outside it each a mine with probability density, within what is left of
+    budget if one is given. The largest standard error is recorded in
+    budget, with NumPy if budget.vectorized. Falls back on
+    estimate_probabilities if too few consistent configurations were drawn.
+    """
+    vectorized = budget is not None and budget.vectorized
+    sampled = sample_component(cells, constraints, density,
+                               vectorized=vectorized, budget=budget)
+    if sampled is None:
+        return estimate_probabilities(cells, constraints)
+    probabilities, errors = sampled
+    if budget is not None:
+        budget.record_error(max(errors.values()))
+    return probabilities
+
+
+def estimate_probabilities(cells, constraints):
+    """
+    Estimates the mine probability of every square of a component as the
+    mean of the densities (constant over number of squares) of the
+    constraints it belongs to.
+    """
+    totals = dict.fromkeys(cells, 0.0)
+    numbers = dict.fromkeys(cells, 0)
+    for cs, count in constraints:
+        density = count / len(cs)
+        for cell in cs:
+            totals[cell] += density
+            numbers[cell] += 1
+    return {cell: totals[cell] / numbers[cell] for cell in cells}
+
+
+@lru_cache(maxsize=None)
+def binomial(n, k):
+    """
+    Returns n choose k, memoized since the same interior sizes and mine counts
+    come up on every decision of a game.
+    """
+    if k < 0 or k > n:
+        return 0
+    return comb(n, k)
+
+
+def multiply_counts(a, b):
+    """
+    Multiplies two mine-count polynomials, given as dictionaries mapping a
+    number of mines to a number of ways.
+    """
+    product = {}
+    for x, x_ways in a.items():
+        for y, y_ways in b.items():
+            if x + y not in product:
+                product[x + y] = 0
+            product[x + y] += x_ways * y_ways
+    return product
+
+
+def solve_frontier(constraints, mines_left, num_interior, profiler=None,
+                   cache=None, position=None, budget=None):
+    """
+    Computes the exact mine probability of every frontier square, given that
+    mines_left mines remain on the board and num_interior unknown squares are
+    not part of any constraint. Each frontier configuration with K mines is
+    weighted by the number of ways to place the other mines_left - K mines in
+    the interior.
+
+    Returns (safe, mines, probabilities, interior_probability): the frontier
+    squares that are never and always mines, the mine probability of each
+    frontier square, and the mine probability of each interior square. If
+    the constraints cannot be satisfied, probabilities is empty. Components
+    are counted with count_component.
+
+    If a budget.SearchBudget runs out, the result is approximate: the
+    components counted so far are weighed on their own as in solve_component
+    and the others are sampled with sample_probabilities, against the
+    density of the unknown squares, which is also the interior probability.
+    Only the squares forced within a counted component are safe or mines.
+    """
+    components = []
+    uncounted = []
+    for cells, component_constraints in get_components(constraints):
+        try:
+            solution_counts, mine_counts = count_component(
+                cells, component_constraints, mines_left, profiler, cache,
+                position, budget)
+        except BudgetExceeded:
+            uncounted.append((cells, component_constraints))
+            continue
+        if not solution_counts:
+            # inconsistent constraints, nothing can be deduced
+            return [], [], {}, None
+        components.append((cells, solution_counts, mine_counts))
+    if uncounted:
+        num_unknown = num_interior + \
+            sum(len(cells) for cells, _ in uncounted) + \
+            sum(len(cells) for cells, _, _ in components)
+        density = mines_left / num_unknown
+        safe = []
+        mines = []
+        probabilities = {}
+        for cells, component_constraints in uncounted:
+            probabilities.update(sample_probabilities(
+                cells, component_constraints, density, budget))
+        for cells, solution_counts, mine_counts in components:
+            component_safe, component_mines, component_probabilities = \
+                weigh_component(cells, solution_counts, mine_counts, density)
+            safe.extend(component_safe)
+            mines.extend(component_mines)
+            probabilities.update(component_probabilities)
+        return safe, mines, probabilities, density if num_interior else None
+
+    def interior_ways(k):
+        return binomial(num_interior, mines_left - k)
+
+    # prefix[i] is the mine-count polynomial of the components before i and
+    # suffix[i] that of the components from i onwards
+    prefix = [{0: 1}]
+    for _, solution_counts, _ in components:
+        prefix.append(multiply_counts(prefix[-1], solution_counts))
+    suffix = [{0: 1}]
+    for _, solution_counts, _ in reversed(components):
+        suffix.append(multiply_counts(suffix[-1], solution_counts))
+    suffix.reverse()
+
+    total_weight = 0
+    interior_mines = 0
+    for k, ways in prefix[-1].items():
+        weight = ways * interior_ways(k)
+        total_weight += weight
+        interior_mines += weight * (mines_left - k)
+    if total_weight == 0:
+        return [], [], {}, None
+    interior_probability = None
+    if num_interior:
+        interior_probability = interior_mines / (total_weight * num_interior)
+
+    safe = []
+    mines = []
+    probabilities = {}
+    for c, (cells, solution_counts, mine_counts) in enumerate(components):
+        others = multiply_counts(prefix[c], suffix[c+1])
+        cell_weights = [0] * len(cells)
+        for k in solution_counts:
+            weight = 0
+            for t, ways in others.items():
+                weight += ways * interior_ways(k + t)
+            if weight == 0:
+                continue
+            for i, mine_count in enumerate(mine_counts[k]):
+                cell_weights[i] += mine_count * weight
+        for cell, cell_weight in zip(cells, cell_weights):
+            if cell_weight == 0:
+                safe.append(cell)
+            elif cell_weight == total_weight:
+                mines.append(cell)
+            probabilities[cell] = cell_weight / total_weight
+    return safe, mines, probabilities, interior_probability
+
+
+def solve_component(cells, constraints, mines_left, density, profiler=None,
+                    cache=None, position=None, budget=None):
+    """
+    Computes the mine probabilities of a single component on its own, for
+    boards too large to combine every component exactly. The squares outside
+    the component are treated as independent squares that are each a mine
+    with probability density, so a solution with k mines is weighted by
+    (density / (1 - density)) ** k.
+
+    Returns (safe, mines, probabilities) like solve_frontier, with empty
+    probabilities if the constraints cannot be satisfied. If a
+    budget.SearchBudget runs out, the probabilities are estimated with
+    sample_probabilities and no square is safe or a mine.
+    """
+    try:
+        solution_counts, mine_counts = count_component(
+            cells, constraints, mines_left, profiler, cache, position, budget)
+    except BudgetExceeded:
+        return [], [], sample_probabilities(cells, constraints, density,
+                                            budget)
+    if not solution_counts:
+        return [], [], {}
+    return weigh_component(cells, solution_counts, mine_counts, density)
+
+
+def weigh_component(cells, solution_counts, mine_counts, density):
+    """
+    Returns (safe, mines, probabilities) of a counted component for
+    solve_component.
+    """
+    if 0 < density < 1:
+        log_ratio = log(density / (1 - density))
+    else:
+        log_ratio = 0
+    log_weights = {k: log(count) + k * log_ratio
+                   for k, count in solution_counts.items()}
+    max_log_weight = max(log_weights.values())
+
+    total_weight = 0
+    cell_weights = [0] * len(cells)
+    never_mine = [True] * len(cells)
+    always_mine = [True] * len(cells)
+    for k, count in solution_counts.items():
+        weight = exp(log_weights[k] - max_log_weight)
+        total_weight += weight
+        for i, mine_count in enumerate(mine_counts[k]):
+            cell_weights[i] += weight * mine_count / count
+            if mine_count != 0:
+                never_mine[i] = False
+            if mine_count != count:
+                always_mine[i] = False
+
+    safe = []
+    mines = []
+    probabilities = {}
+    for i, cell in enumerate(cells):
+        if never_mine[i]:
+            safe.append(cell)
+        elif always_mine[i]:
+            mines.append(cell)
+        probabilities[cell] = cell_weights[i] / total_weight
+    return safe, mines, probabilities
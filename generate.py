@@ -0,0 +1,101 @@
+"""
+Vectorized board generation with NumPy.
+
+Boards are generated in batches as (count, rows, cols) arrays: mine positions
+are sampled without replacement for every board at once, and adjacency counts,
+when needed, are the sum of the eight shifted copies of the mine array.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from neighbors import OFFSETS
+
+# number of boards generated together by seeded_bomb_positions
+BLOCK_SIZE = 1024
+# largest number of squares in one block, so large boards come in smaller
+# blocks
+BLOCK_CELLS = 1 << 20
+
+
+def generate_boards(rows, cols, num_mines, count=1, seed=None):
+    """
+    Generates count boards of rows by cols squares with num_mines mines each.
+    Returns (mines, numbers), two uint8 arrays of shape (count, rows, cols)
+    where mines is 1 on every mine and numbers holds the adjacency counts.
+    """
+    mines = generate_mines(rows, cols, num_mines, count, seed)
+    return mines, count_adjacent_bombs(mines)
+
+
+def generate_mines(rows, cols, num_mines, count=1, seed=None):
+    """
+    Same as generate_boards, but only returns the mines array, for callers
+    whose boards count their adjacent mines themselves.
+    """
+    rng = np.random.default_rng(seed)
+    size = rows * cols
+    if count == 1:
+        positions = rng.choice(size, num_mines, replace=False)[np.newaxis]
+    else:
+        # the num_mines smallest of size uniform keys are a sample without
+        # replacement, drawn for every board in one call
+        keys = rng.random((count, size))
+        positions = np.argpartition(keys, num_mines - 1,
+                                    axis=1)[:, :num_mines]
+    mines = np.zeros((count, size), dtype=np.uint8)
+    np.put_along_axis(mines, positions, 1, axis=1)
+    return mines.reshape(count, rows, cols)
+
+
+def count_adjacent_bombs(mines):
+    """
+    Returns the number of adjacent mines of every square of mines, an array of
+    shape (count, rows, cols), as an array of the same shape.
+    """
+    _, rows, cols = mines.shape
+    padded = np.pad(mines, ((0, 0), (1, 1), (1, 1)))
+    numbers = np.zeros(mines.shape, dtype=np.uint8)
+    for dx, dy in OFFSETS:
+        numbers += padded[:, 1+dx:1+dx+rows, 1+dy:1+dy+cols]
+    return numbers
+
+
+def to_bomb_positions(mines):
+    """
+    Returns the set of (row, col) mine positions of a single (rows, cols)
+    mine array, as accepted by MSBoard.create_layout.
+    """
+    return {(int(x), int(y)) for x, y in zip(*np.nonzero(mines))}
+
+
+def get_block_size(rows, cols):
+    """
+    Returns the number of boards of rows by cols squares in one block.
+    """
+    return max(1, min(BLOCK_SIZE, BLOCK_CELLS // (rows * cols)))
+
+
+@lru_cache(maxsize=8)
+def get_board_block(rows, cols, num_mines, block):
+    """
+    Returns the mines array of block number block. The boards of
+    MSBoard.create_layout and the other backends count their adjacent mines
+    themselves, so the numbers are not computed.
+    """
+    return generate_mines(rows, cols, num_mines, get_block_size(rows, cols),
+                          seed=block)
+
+
+def seeded_bomb_positions(rows, cols, num_mines, seed):
+    """
+    Returns the bomb positions of the board for game seed. Boards are
+    generated get_block_size(rows, cols) at a time, BLOCK_SIZE for the
+    standard difficulties, and game seed always gets board seed % block_size
+    of block seed // block_size. seed must not be negative.
+    """
+    if seed < 0:
+        raise ValueError(f"seed must not be negative, got {seed}")
+    block_size = get_block_size(rows, cols)
+    mines = get_board_block(rows, cols, num_mines, seed // block_size)
+    return to_bomb_positions(mines[seed % block_size])
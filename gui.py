@@ -0,0 +1,603 @@
+"""
+Kivy GUI of the game. Importing this module loads Kivy and sets its input
+configuration, so it is only imported by main.py once the GUI is started;
+the board, solvers and benchmarks never import it.
+"""
+import random
+import time
+
+import kivy
+from kivy.app import App
+from kivy.clock import Clock
+from kivy.config import Config
+from kivy.core.window import Window
+from kivy.factory import Factory
+from kivy.uix.button import Button
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.image import Image
+from kivy.uix.label import Label
+from kivy.uix.popup import Popup
+from kivy.uix.togglebutton import ToggleButton, ToggleButtonBehavior
+from kivy.uix.widget import Widget
+
+from board import MSBoard, generate_bomb_positions, get_board_size
+from budget import SearchBudget
+from csp import MSCSP
+from playback import ACTIONS_PER_SECOND, ActionPlayback
+from record import bomb_positions, decode_actions, starting_point
+from session import MSSession
+from textures import BOMB, FLAG, TILE, get_tile_atlas, number
+
+Config.set('input', 'mouse', 'mouse,multitouch_on_demand')
+kivy.require('2.0.0')
+
+# longest time the computer plays moves in one frame before the window is
+# redrawn; each search is also limited to this time, so that a large
+# frontier cannot freeze the window
+SOLVE_SECONDS_PER_FRAME = 0.01
+
+
+class AdjacentButtons(BoxLayout):
+
+    def __init__(self, **kwargs):
+        self.game = kwargs.pop("game")
+        super().__init__(**kwargs)
+        self.buttons = []
+
+    def add_popup_buttons(self, is_player, popup):
+        game = self.game
+        session = game.session
+        replay_button = Button(text="Replay",
+                               size=(200, 200))
+        replay_button.bind(on_release=lambda *args: game.restart(session.gamemode,
+                                                                 session.difficulty,
+                                                                 popup,
+                                                                 *args))
+        self.buttons.append(replay_button)
+        self.add_widget(replay_button)
+        if is_player:
+            replay_as_button = Button(text="Replay as\nComputer",
+                                      size=(200, 200),
+                                      halign='center',
+                                      valign='center')
+            replay_as_button.bind(on_release=lambda *args: game.restart("computer",
+                                                                        session.difficulty,
+                                                                        popup,
+                                                                        *args))
+            self.buttons.append(replay_as_button)
+            self.add_widget(replay_as_button)
+        else:
+            replay_button = Button(text="Replay as\nPlayer",
+                                   size=(200, 200),
+                                   halign='center',
+                                   valign='center')
+            replay_button.bind(on_release=lambda *args: game.restart("player",
+                                                                     session.difficulty,
+                                                                     popup,
+                                                                     *args))
+            self.buttons.append(replay_button)
+            self.add_widget(replay_button)
+
+        main_menu_button = Button(text="Main Menu", size=(200, 200))
+        main_menu_button.bind(
+            on_release=lambda *args: game.reset(popup, *args))
+        self.buttons.append(main_menu_button)
+        self.add_widget(main_menu_button)
+
+        quit_button = Button(text="Quit", size=(200, 200))
+        quit_button.bind(on_release=App.get_running_app().stop)
+        self.buttons.append(quit_button)
+        self.add_widget(quit_button)
+
+
+class WelcomeScreen(Label):
+
+    def __init__(self, **kwargs):
+        self.session = kwargs.pop("session")
+        super().__init__(**kwargs)
+        self.size = Window.size
+        self.buttons = []
+
+    def set_difficulty(self, diff, *args):
+        self.session.difficulty = diff
+
+    def set_gamemode(self, mode, *args):
+        self.session.gamemode = mode
+
+    def create_buttons(self):
+        self.buttons = []
+        easy = ToggleButton(text="Easy",
+                            size=(0.2 * Window.size[0], 0.1 * Window.size[1]),
+                            pos=(0.1 * Window.size[0], 0.3 * Window.size[1]),
+                            group="difficulties",
+                            on_press=lambda *args: self.set_difficulty("easy", *args))
+        self.add_widget(easy)
+        self.buttons.append(easy)
+        medium = ToggleButton(text="Medium",
+                              size=(0.2 * Window.size[0],
+                                    0.1 * Window.size[1]),
+                              pos=(0.4 * Window.size[0], 0.3 * Window.size[1]),
+                              group="difficulties",
+                              on_press=lambda *args: self.set_difficulty("medium", *args))
+        self.add_widget(medium)
+        self.buttons.append(medium)
+        hard = ToggleButton(text="Hard",
+                            size=(0.2 * Window.size[0], 0.1 * Window.size[1]),
+                            pos=(0.7 * Window.size[0], 0.3 * Window.size[1]),
+                            group="difficulties",
+                            on_press=lambda *args: self.set_difficulty("hard", *args))
+        self.add_widget(hard)
+        self.buttons.append(hard)
+
+        player = ToggleButton(text="Player",
+                              size=(0.2 * Window.size[0],
+                                    0.1 * Window.size[1]),
+                              pos=(0.25 * Window.size[0],
+                                   0.1 * Window.size[1]),
+                              group="modes",
+                              on_press=lambda *args: self.set_gamemode("player", *args))
+        self.add_widget(player)
+        self.buttons.append(player)
+        computer = ToggleButton(text="Computer",
+                                size=(0.2 * Window.size[0],
+                                      0.1 * Window.size[1]),
+                                pos=(0.55 * Window.size[0],
+                                     0.1 * Window.size[1]),
+                                group="modes",
+                                on_press=lambda *args: self.set_gamemode("computer", *args))
+        self.add_widget(computer)
+        self.buttons.append(computer)
+
+        play = Button(text="PLAY",
+                      size=(0.2 * Window.size[0], 0.1 * Window.size[1]),
+                      pos=(0.25 * Window.size[0], 0.6 * Window.size[1]))
+        self.add_widget(play)
+        self.buttons.append(play)
+
+        quit = Button(text="Quit",
+                      size=(0.2 * Window.size[0], 0.1 * Window.size[1]),
+                      pos=(0.55 * Window.size[0], 0.6 * Window.size[1]))
+        quit.bind(on_release=App.get_running_app().stop)
+        self.add_widget(quit)
+        self.buttons.append(quit)
+
+
+class MSTile(Image, ToggleButtonBehavior):
+    """
+    View of a single MSSquare. The square holds the game state; the tile only
+    tracks what is currently shown on screen, as a region of the shared tile
+    atlas.
+    """
+    last_touch_button = Factory.StringProperty(None)
+
+    def __init__(self, **kwargs):
+        self.game = kwargs.pop("game")
+        self.square = kwargs.pop("square")
+        self.atlas = kwargs.pop("atlas")
+        super().__init__(**kwargs)
+        self.allow_stretch = True
+        self.keep_ratio = False
+        self.is_revealed = False
+        self.image_index = None
+        self.show(TILE)
+
+    def reset(self, square):
+        """
+        Puts the tile back to covered, as a view of square, so that it can be
+        reused for a new game.
+        """
+        self.square = square
+        self.is_revealed = False
+        self.last_touch_button = None
+        self.state = "normal"
+        self.show(TILE)
+
+    def show(self, index):
+        """
+        Shows image index of the tile atlas.
+        """
+        if index != self.image_index:
+            self.image_index = index
+            self.texture = self.atlas[index]
+
+    def on_touch_down(self, touch):
+        game = self.game
+        if game.session.gamemode != "player":
+            return
+        if self.collide_point(*touch.pos):
+            self.last_touch_button = touch.button
+            square = self.square
+            if self.last_touch_button == 'right':
+                if square.is_flagged:
+                    self.show(TILE)
+                    square.is_flagged = False
+                else:
+                    self.show(FLAG)
+                    square.is_flagged = True
+            if self.last_touch_button == 'left':
+                square.is_flagged = False
+                if not square.is_bomb:
+                    if not square.is_uncovered:
+                        square.is_uncovered = True
+                        self.is_revealed = True
+                        if game.session.uncover_safe_tile():
+                            game.open_game_over_popup("You won!",
+                                                      is_player=True)
+                    self.show(number(square.adjacent_bombs))
+
+                else:
+                    self.show(BOMB)
+                    game.open_game_over_popup("Game Over!", is_player=True)
+        return super(MSTile, self).on_touch_down(touch)
+
+
+class MSGrid(GridLayout):
+    """
+    Kivy view over an MSBoard, with one MSTile widget per square. Tiles are
+    pooled by board size, so a new game of a size played before resets the
+    existing tiles in place instead of building new widgets.
+    """
+
+    def __init__(self, **kwargs):
+        self.game = kwargs.pop("game")
+        super().__init__(**kwargs)
+        self.num_mines = 0
+        self.board = None
+        self.grid = []
+        self.atlas = get_tile_atlas()
+        # tile grids of the board sizes played so far, by (rows, cols)
+        self.pool = {}
+
+    def create_layout(self, bomb_positions):
+        self.board = MSBoard(self.rows, self.cols, self.num_mines)
+        self.board.create_layout(bomb_positions)
+        tiles = self.pool.get((self.rows, self.cols))
+        if tiles is None:
+            tiles = [[None for _ in range(self.cols)]
+                     for _ in range(self.rows)]
+            for i in range(self.rows):
+                for j in range(self.cols):
+                    tiles[i][j] = MSTile(game=self.game, atlas=self.atlas,
+                                         square=self.board.grid[i][j])
+            self.pool[(self.rows, self.cols)] = tiles
+        else:
+            for i in range(self.rows):
+                for j in range(self.cols):
+                    tiles[i][j].reset(self.board.grid[i][j])
+        # uncomment next lines to see bomb placements
+        # for x, y in bomb_positions:
+        #     tiles[x][y].show(BOMB)
+        if self.grid is not tiles or not self.children:
+            self.clear_widgets()
+            for row in tiles:
+                for tile in row:
+                    self.add_widget(tile)
+            self.grid = tiles
+
+
+class MSGame(Widget):
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.session = MSSession()
+        self.grid = MSGrid(size=Window.size, game=self)
+        self.welcome_screen = WelcomeScreen(
+            text="MINESWEEPER\nSelect difficulty, gamemode, and press play!",
+            halign='center',
+            valign='center',
+            session=self.session)
+        self.bomb_positions = set()
+        # random generator of the current board, which also makes the
+        # computer's guesses
+        self.rng = None
+        # game record being replayed, if any
+        self.record = None
+        self.player = MSCSPPlayer(game=self)
+        # computer solver still playing its game, and the Clock event that
+        # plays its moves
+        self.csp = None
+        self.solve_event = None
+        self.bind(size=self.resize_grid)
+        Window.bind(on_key_down=self.on_key_down)
+
+    def on_key_down(self, window, key, scancode, codepoint, modifier):
+        """
+        Playback controls of computer games: space pauses or resumes, s skips
+        to the end, + and - double or halve the speed and i plays the rest
+        instantly.
+        """
+        session = self.session
+        if session.gamemode != "computer":
+            return False
+        if codepoint == " ":
+            self.player.toggle_pause()
+        elif codepoint == "s":
+            self.player.skip()
+        elif codepoint in ("+", "-", "i"):
+            speed = session.playback_speed or ACTIONS_PER_SECOND
+            if codepoint == "+":
+                session.playback_speed = speed * 2
+            elif codepoint == "-":
+                session.playback_speed = max(1, speed // 2)
+            else:
+                session.playback_speed = None
+            self.player.set_speed(session.playback_speed)
+        else:
+            return False
+        return True
+
+    def resize_grid(self, *args):
+        self.grid.size = Window.size
+        self.welcome_screen.size = Window.size
+        for button in self.welcome_screen.children:
+            button.size = (0.2 * Window.size[0], 0.1 * Window.size[1])
+            if button.text == "Easy":
+                button.pos = (0.1 * Window.size[0], 0.3 * Window.size[1])
+            if button.text == "Medium":
+                button.pos = (0.4 * Window.size[0], 0.3 * Window.size[1])
+            if button.text == "Hard":
+                button.pos = (0.7 * Window.size[0], 0.3 * Window.size[1])
+            if button.text == "Player":
+                button.pos = (0.25 * Window.size[0], 0.1 * Window.size[1])
+            if button.text == "Computer":
+                button.pos = (0.55 * Window.size[0], 0.1 * Window.size[1])
+            if button.text == "PLAY":
+                button.pos = (0.25 * Window.size[0], 0.6 * Window.size[1])
+            if button.text == "Quit":
+                button.pos = (0.55 * Window.size[0], 0.6 * Window.size[1])
+
+    def set_variables(self):
+        rows, cols, num_mines = get_board_size(self.session.difficulty)
+        self.grid.rows = rows
+        self.grid.cols = cols
+        self.grid.num_mines = num_mines
+
+    def set_bomb_positions(self):
+        """
+        Places the mines of the session's seed, picking a new seed if there is
+        none. As in benchmark.new_game, the generator that placed the mines
+        then makes the computer's guesses, so a computer game plays exactly
+        like the headless game of the same seed, and a replay of the same
+        seed gets the same board.
+        """
+        session = self.session
+        if session.seed is None:
+            session.seed = random.randrange(2**32)
+        self.rng = random.Random(session.seed)
+        self.bomb_positions = generate_bomb_positions(
+            self.grid.rows, self.grid.cols, self.grid.num_mines, self.rng)
+
+    def replay_record(self, record):
+        """
+        Starts the computer game of a record from record.py, replaying its
+        recorded actions.
+        """
+        self.record = record
+        self.session.difficulty = record["difficulty"]
+        self.session.gamemode = "computer"
+        self.session.seed = record["seed"]
+        self.bomb_positions = bomb_positions(record)
+        self.begin_game()
+
+    def uncover_starting_point(self):
+        """
+        Uncovers the recorded starting square of a replayed record, otherwise
+        the first non-bomb square with the fewest adjacent bombs.
+        """
+        board = self.grid.board
+        if self.record is not None:
+            x, y = starting_point(self.record)
+            board.uncover_starting_point(x, y)
+        else:
+            board.uncover_first_non_bomb_tile()
+        x, y = board.starting_point
+        square = board.grid[x][y]
+        t = self.grid.grid[x][y]
+        t.show(number(square.adjacent_bombs))
+        t.is_revealed = True
+        self.session.uncover_safe_tile()
+
+    def open_game_over_popup(self, title, is_player):
+        popup_buttons = AdjacentButtons(orientation='horizontal', game=self)
+        title = f"{title}\nTime: {self.session.elapsed_time_str()}"
+        if self.session.solve_time is not None:
+            # the time above includes the animation
+            title += f" (solver: {self.session.solve_time:.3f}s)"
+        popup = Popup(title=f"{title}  Seed: {self.session.seed}",
+                      content=popup_buttons,
+                      auto_dismiss=False,
+                      size=(900, 900),
+                      size_hint=(None, None))
+        popup_buttons.add_popup_buttons(is_player=is_player, popup=popup)
+        popup.open()
+
+    def initialize_game(self):
+        self.welcome_screen.create_buttons()
+        for button in self.welcome_screen.buttons:
+            if button.text == "PLAY":
+                button.bind(on_release=self.begin_game)
+        self.add_widget(self.welcome_screen)
+
+    def begin_game(self, *args):
+        session = self.session
+        if session.difficulty is not None and session.gamemode is not None:
+            self.set_variables()
+            for button in self.welcome_screen.buttons:
+                self.welcome_screen.remove_widget(button)
+                self.remove_widget(button)
+            self.remove_widget(self.welcome_screen)
+            if self.record is None:
+                self.set_bomb_positions()
+            session.start(self.grid.rows, self.grid.cols,
+                          len(self.bomb_positions))
+            self.grid.create_layout(bomb_positions=self.bomb_positions)
+            self.add_widget(self.grid)
+            self.uncover_starting_point()
+            if session.gamemode == "computer":
+                if self.record is not None:
+                    actions = decode_actions(self.record["actions"],
+                                             self.grid.cols)
+                    self.player.perform_actions(actions,
+                                                session.playback_speed)
+                else:
+                    budget = SearchBudget(seconds=SOLVE_SECONDS_PER_FRAME)
+                    self.solve(MSCSP(board=self.grid.board, rng=self.rng,
+                                     budget=budget))
+
+    def solve(self, csp):
+        """
+        Lets csp play its game a few moves per frame, so the window stays
+        responsive however long the game takes, and plays its actions on
+        the grid once the game is over.
+        """
+        self.stop_solving()
+        self.csp = csp
+        self.session.solve_time = 0.0
+        self.solve_event = Clock.schedule_interval(self.solve_moves, 0)
+
+    def solve_moves(self, dt):
+        start = time.perf_counter()
+        playing = True
+        while playing and \
+                time.perf_counter() - start < SOLVE_SECONDS_PER_FRAME:
+            playing = self.csp.step()
+        self.session.solve_time += time.perf_counter() - start
+        if not playing:
+            actions = self.csp.actions
+            self.stop_solving()
+            self.player.perform_actions(actions, self.session.playback_speed)
+
+    def stop_solving(self):
+        if self.solve_event is not None:
+            self.solve_event.cancel()
+            self.solve_event = None
+        self.csp = None
+
+    def restart(self, gamemode, difficulty, popup, *largs):
+        self.session.gamemode = gamemode
+        self.session.difficulty = difficulty
+        if popup is not None:
+            popup.dismiss()
+        self.stop_solving()
+        self.player.stop()
+        # clear welcome screen
+        self.welcome_screen.clear_widgets()
+        # the grid keeps its tiles, which begin_game resets in place
+        # clear game widgets
+        self.clear_widgets()
+
+        self.begin_game()
+
+    def reset(self, popup, *largs):
+        self.session.gamemode = None
+        self.session.difficulty = None
+        self.session.seed = None
+        self.record = None
+        if popup is not None:
+            popup.dismiss()
+        self.stop_solving()
+        self.player.stop()
+        # clear welcome screen
+        self.welcome_screen.clear_widgets()
+        # clear grid
+        self.grid.num_mines = 0
+        self.grid.board = None
+        # the tiles stay pooled, but the next game may have another size
+        self.grid.clear_widgets()
+        # clea game widgets
+        self.bomb_positions = set()
+        self.clear_widgets()
+
+        self.initialize_game()
+
+
+class MSCSPPlayer():
+    """
+    Replays the actions recorded by an MSCSP run on the tiles of a game's
+    MSGrid. A single Clock event runs every frame and draws all the actions
+    that became due since the previous frame, so a whole game never queues
+    one event per action.
+    """
+
+    def __init__(self, **kwargs):
+        self.game = kwargs.get("game")
+        self.grid = self.game.grid
+        self.playback = None
+        self.event = None
+        self.game_over = None
+
+    def uncover_tile(self, t):
+        if t.square.is_bomb:
+            t.show(BOMB)
+            self.game_over = "Game Lost!"
+        else:
+            t.show(number(t.square.adjacent_bombs))
+            if t.is_revealed:
+                return
+            t.is_revealed = True
+            if self.game.session.uncover_safe_tile():
+                self.game_over = "Game Won!"
+
+    def flag_tile(self, t):
+        t.show(FLAG)
+
+    def perform_actions(self, actions, speed=ACTIONS_PER_SECOND):
+        """
+        Starts playing actions at speed actions per second, or all in the
+        next frame if speed is None.
+        """
+        self.stop()
+        self.playback = ActionPlayback(actions=actions, speed=speed)
+        self.event = Clock.schedule_interval(self.update, 0)
+
+    def update(self, dt):
+        self.draw(self.playback.advance(dt))
+
+    def draw(self, actions):
+        for (x, y), s in actions:
+            tile = self.grid.grid[x][y]
+            if s == "uncover":
+                self.uncover_tile(tile)
+            elif s == "flag":
+                self.flag_tile(tile)
+        if self.playback.is_done():
+            self.stop()
+            if self.game_over is not None:
+                title, self.game_over = self.game_over, None
+                self.game.open_game_over_popup(title, is_player=False)
+
+    def toggle_pause(self):
+        if self.playback is not None:
+            self.playback.toggle_pause()
+
+    def skip(self):
+        """
+        Draws every remaining action at once.
+        """
+        if self.playback is not None and not self.playback.is_done():
+            self.draw(self.playback.skip())
+
+    def set_speed(self, speed):
+        if self.playback is not None:
+            self.playback.set_speed(speed)
+
+    def stop(self):
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+
+
+class MinesweeperApp(App):
+
+    def __init__(self, **kwargs):
+        self.record = kwargs.pop("record", None)
+        super().__init__(**kwargs)
+
+    def build(self):
+        game = MSGame()
+        if self.record is not None:
+            game.replay_record(self.record)
+        else:
+            game.initialize_game()
+        return game
@@ -0,0 +1,52 @@
+"""
+Precomputed neighbor index tables.
+
+Squares are numbered in row-major order. A NeighborTable stores the neighbors
+of every square of a rows by cols board as flat CSR-style arrays, and tables
+are cached per board size so that every game of the same size shares one.
+"""
+from functools import lru_cache
+
+# neighbor offsets, in the order get_adjacent_tiles has always returned them
+OFFSETS = [(-1, 0), (-1, 1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, -1)]
+
+
+class NeighborTable():
+    """
+    Immutable neighbor index of a rows by cols board. The neighbors of square
+    i are indices[offsets[i]:offsets[i+1]], which are also available without
+    slicing as the tuple neighbors[i].
+    """
+    __slots__ = ("rows", "cols", "size", "offsets", "indices", "neighbors")
+
+    def __init__(self, rows, cols):
+        offsets = [0]
+        indices = []
+        for i in range(rows):
+            for j in range(cols):
+                for dx, dy in OFFSETS:
+                    x = i + dx
+                    y = j + dy
+                    if 0 <= x < rows and 0 <= y < cols:
+                        indices.append(x * cols + y)
+                offsets.append(len(indices))
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.offsets = tuple(offsets)
+        self.indices = tuple(indices)
+        self.neighbors = tuple(self.indices[offsets[i]:offsets[i+1]]
+                               for i in range(self.size))
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f"NeighborTable.{name} is read-only")
+        super().__setattr__(name, value)
+
+
+@lru_cache(maxsize=None)
+def get_neighbor_table(rows, cols):
+    """
+    Returns the shared NeighborTable for a rows by cols board.
+    """
+    return NeighborTable(rows, cols)
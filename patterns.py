@@ -0,0 +1,325 @@
+"""
+Precomputed table of small frontier patterns with forced moves.
+
+The table maps the canonical encoding of a small frontier component (see
+cache.canonical_form, which is the same for translated, rotated and mirrored
+copies) to the squares of the component that are safe or mines in every
+solution. A square forced in a component on its own is forced on the whole
+board, so the solvers can play these moves straight from the table before
+solving the frontier.
+
+The table is generated from the components met in seeded games, on first
+use or with the command below, and stored in a binary file that is
+memory-mapped, as open-addressing hash tables of fixed-size records, so a
+lookup reads a few bytes of the file:
+
+    header:      magic b"MSPT", version, number of pattern slots and of
+                 signature slots (powers of 2) and the largest pattern size,
+                 as little-endian uint32s
+    patterns:    64-bit hash of the encoding (0 for an empty slot), the
+                 bitmasks of the safe and mine squares in canonical
+                 numbering, and the offset and length of the encoding in the
+                 keys section, as uint64, uint32, uint32, uint32, uint32
+    signatures:  64-bit hashes of the signatures of the patterns, as uint64
+    keys:        the encodings of the patterns (see encode_key)
+
+A lookup compares the stored encoding with the one it looks for, so two
+patterns with the same hash are told apart. A signature only depends on the
+sizes and constants of the constraints, so it is checked first and the
+canonical encoding, which tries every symmetry, is only computed for
+components that may be in the table; a signature hash that collides only
+costs that computation.
+
+    python3 patterns.py -n 2000 -o data/patterns.bin
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from hashlib import blake2b
+
+from cache import canonical_form
+from frontier import enumerate_component, get_components
+
+MAGIC = b"MSPT"
+VERSION = 2
+HEADER = struct.Struct("<4sIIII")
+SLOT = struct.Struct("<QIIII")
+SIGNATURE_SLOT = struct.Struct("<Q")
+
+# largest component kept in the table, in squares (at most 32 for the masks)
+PATTERN_CELLS = 16
+
+PATTERNS_FILE = "data/patterns.bin"
+
+# games played to generate the table
+DIFFICULTIES = ["easy", "medium", "hard"]
+GAMES = 2000
+
+
+def pattern_hash(key):
+    """
+    Returns the 64-bit hash of a canonical encoding or signature, never 0.
+    """
+    digest = blake2b(repr(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+def encode_key(key):
+    """
+    Returns the canonical encoding key as bytes: the number of squares, then
+    for each constraint its size, its constant and its squares.
+    """
+    num_cells, constraints = key
+    encoded = bytearray([num_cells])
+    for cs, count in constraints:
+        encoded.append(len(cs))
+        encoded.append(count)
+        encoded.extend(cs)
+    return bytes(encoded)
+
+
+def signature(cells, constraints):
+    """
+    Returns the number of squares and the sorted sizes and constants of the
+    constraints of a component, which are the same for all its symmetries.
+    """
+    return len(cells), tuple(sorted((len(cs), count)
+                                    for cs, count in constraints))
+
+
+def table_size(n):
+    """
+    Returns the number of slots of a hash table of n entries, a power of 2
+    at least twice n.
+    """
+    num_slots = 1
+    while num_slots < 2 * n:
+        num_slots *= 2
+    return num_slots
+
+
+def insert(slots, h, record):
+    mask = len(slots) - 1
+    slot = h & mask
+    while slots[slot] is not None:
+        slot = (slot + 1) & mask
+    slots[slot] = record
+
+
+class PatternTable():
+    """
+    Read-only view of a pattern file, memory-mapped.
+    """
+
+    def __init__(self, filename=PATTERNS_FILE):
+        with open(filename, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self.num_slots, self.num_signature_slots, \
+                self.max_cells = HEADER.unpack_from(self.data, 0)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{filename} is not a version {VERSION} "
+                             "pattern file")
+        self.signatures_offset = HEADER.size + self.num_slots * SLOT.size
+        self.keys_offset = self.signatures_offset + \
+            self.num_signature_slots * SIGNATURE_SLOT.size
+
+    def close(self):
+        self.data.close()
+
+    def lookup(self, key):
+        """
+        Returns (safe, mines), the bitmasks of the forced squares of the
+        pattern with canonical encoding key, or None if it is not in the
+        table.
+        """
+        h = pattern_hash(key)
+        encoded = None
+        mask = self.num_slots - 1
+        slot = h & mask
+        while True:
+            stored, safe, mines, offset, length = SLOT.unpack_from(
+                self.data, HEADER.size + slot * SLOT.size)
+            if stored == h:
+                if encoded is None:
+                    encoded = encode_key(key)
+                offset += self.keys_offset
+                if self.data[offset:offset + length] == encoded:
+                    return safe, mines
+            elif stored == 0:
+                return None
+            slot = (slot + 1) & mask
+
+    def has_signature(self, cells, constraints):
+        """
+        Returns False if no pattern of the table has the signature of the
+        component cells.
+        """
+        h = pattern_hash(signature(cells, constraints))
+        mask = self.num_signature_slots - 1
+        slot = h & mask
+        while True:
+            stored, = SIGNATURE_SLOT.unpack_from(
+                self.data, self.signatures_offset + slot * SIGNATURE_SLOT.size)
+            if stored == h:
+                return True
+            if stored == 0:
+                return False
+            slot = (slot + 1) & mask
+
+    def component_moves(self, cells, constraints, position=None):
+        """
+        Returns (safe, mines), the squares of the component cells that the
+        table knows to be safe or mines. position is passed to
+        canonical_form.
+        """
+        if len(cells) > self.max_cells or \
+                not self.has_signature(cells, constraints):
+            return [], []
+        key, labels = canonical_form(cells, constraints, position)
+        forced = self.lookup(key)
+        if forced is None:
+            return [], []
+        safe_mask, mine_mask = forced
+        safe = [cell for cell, label in zip(cells, labels)
+                if safe_mask >> label & 1]
+        mines = [cell for cell, label in zip(cells, labels)
+                 if mine_mask >> label & 1]
+        return safe, mines
+
+    def forced_moves(self, constraints, position=None):
+        """
+        Same as component_moves, for every component of constraints.
+        """
+        safe = []
+        mines = []
+        for cells, component_constraints in get_components(constraints):
+            component_safe, component_mines = self.component_moves(
+                cells, component_constraints, position)
+            safe.extend(component_safe)
+            mines.extend(component_mines)
+        return safe, mines
+
+
+class PatternCollector():
+    """
+    Stands in for a cache.ComponentCache during generation: it solves the
+    components a solver hands to it and keeps those of at most max_cells
+    squares that have forced squares.
+    """
+
+    def __init__(self, max_cells=PATTERN_CELLS):
+        self.max_cells = max_cells
+        # canonical encoding -> (signature, safe mask, mine mask)
+        self.patterns = {}
+
+    def enumerate_component(self, cells, constraints, max_mines,
+                            profiler=None, position=None, budget=None):
+        solution_counts, mine_counts = enumerate_component(
+            cells, constraints, max_mines, profiler, budget)
+        if len(cells) <= self.max_cells:
+            self.add(cells, constraints, position)
+        return solution_counts, mine_counts
+
+    def add(self, cells, constraints, position=None):
+        key, labels = canonical_form(cells, constraints, position)
+        if key in self.patterns:
+            return
+        # every solution, whatever the number of mines left on the board
+        solution_counts, mine_counts = enumerate_component(
+            cells, constraints, len(cells))
+        if not solution_counts:
+            return
+        total = sum(solution_counts.values())
+        safe_mask = 0
+        mine_mask = 0
+        for i, label in enumerate(labels):
+            mines = sum(counts[i] for counts in mine_counts.values())
+            if mines == 0:
+                safe_mask |= 1 << label
+            elif mines == total:
+                mine_mask |= 1 << label
+        if safe_mask or mine_mask:
+            self.patterns[key] = (signature(cells, constraints), safe_mask,
+                                  mine_mask)
+
+
+def write_table(filename, patterns, max_cells=PATTERN_CELLS):
+    """
+    Writes a pattern file from a dictionary mapping canonical encodings to
+    (signature, safe mask, mine mask), with hash tables at most half full.
+    """
+    slots = [None] * table_size(len(patterns))
+    signatures = set()
+    keys = bytearray()
+    for key, (sig, safe, mines) in patterns.items():
+        h = pattern_hash(key)
+        encoded = encode_key(key)
+        insert(slots, h, (h, safe, mines, len(keys), len(encoded)))
+        keys.extend(encoded)
+        signatures.add(pattern_hash(sig))
+    signature_slots = [None] * table_size(len(signatures))
+    for h in sorted(signatures):
+        insert(signature_slots, h, h)
+    with open(filename, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(slots),
+                               len(signature_slots), max_cells))
+        for slot in slots:
+            file.write(SLOT.pack(*(slot or (0, 0, 0, 0, 0))))
+        for slot in signature_slots:
+            file.write(SIGNATURE_SLOT.pack(slot or 0))
+        file.write(keys)
+
+
+def build_table(difficulties, num_games, seed=0, max_cells=PATTERN_CELLS):
+    """
+    Plays num_games seeded games of each difficulty and returns the patterns
+    of the components their searches solved.
+    """
+    from benchmark import new_game
+    collector = PatternCollector(max_cells)
+    for difficulty in difficulties:
+        for i in range(num_games):
+            solver, _ = new_game(difficulty, seed + i, cache=collector)
+            solver.start_game()
+    return collector.patterns
+
+
+def generate_table(filename=PATTERNS_FILE, difficulties=DIFFICULTIES,
+                   num_games=GAMES, seed=0, max_cells=PATTERN_CELLS):
+    """
+    Builds the table from seeded games with build_table and writes it to
+    filename, creating its directory if needed. Returns the number of
+    patterns.
+    """
+    patterns = build_table(difficulties, num_games, seed, max_cells)
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    write_table(filename, patterns, max_cells)
+    return len(patterns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate the pattern table from seeded games.")
+    parser.add_argument("-n", "--games", type=int, default=GAMES,
+                        help="number of games per difficulty")
+    parser.add_argument("-d", "--difficulty", nargs="+",
+                        default=DIFFICULTIES)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-m", "--max-cells", type=int, default=PATTERN_CELLS,
+                        choices=range(1, 33), metavar="[1-32]")
+    parser.add_argument("-o", "--output", default=PATTERNS_FILE)
+    args = parser.parse_args(argv)
+    num_patterns = generate_table(args.output, args.difficulty, args.games,
+                                  args.seed, args.max_cells)
+    print(f"{num_patterns} patterns written to {args.output}")
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    main()
@@ -0,0 +1,79 @@
+"""
+Timing of the replay of recorded solver actions.
+
+ActionPlayback decides which actions are due as the clock advances and has no
+Kivy dependency; the GUI asks it once per frame for the actions due since the
+previous frame and draws them in one update.
+"""
+
+# default replay speed, in actions per second
+ACTIONS_PER_SECOND = 10
+
+
+class ActionPlayback():
+    """
+    Plays back a list of ((x, y), s) actions at speed actions per second, or
+    all at once if speed is None (instant mode). Can be paused, resumed,
+    sped up or skipped to the end.
+    """
+
+    def __init__(self, **kwargs):
+        self.actions = kwargs.get("actions", [])
+        self.speed = kwargs.get("speed", ACTIONS_PER_SECOND)
+        # index of the next action to play
+        self.position = 0
+        # playback time in seconds, which does not advance while paused
+        self.elapsed = 0
+        self.paused = False
+
+    def is_done(self):
+        return self.position >= len(self.actions)
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def set_speed(self, speed):
+        """
+        Changes the speed without replaying or skipping actions: the elapsed
+        time is rescaled so that the next action stays the next one due.
+        """
+        if speed is not None and self.speed is not None:
+            self.elapsed = self.elapsed * self.speed / speed
+        elif speed is not None:
+            self.elapsed = self.position / speed
+        self.speed = speed
+
+    def advance(self, dt):
+        """
+        Advances the clock by dt seconds and returns the actions that became
+        due, coalesced by square: if a square has several actions due, only
+        its last one is returned.
+        """
+        if self.paused or self.is_done():
+            return []
+        self.elapsed += dt
+        if self.speed is None:
+            end = len(self.actions)
+        else:
+            end = min(len(self.actions), int(self.elapsed * self.speed) + 1)
+        return self.take(end)
+
+    def skip(self):
+        """
+        Returns every remaining action, coalesced as in advance, and ends the
+        playback.
+        """
+        return self.take(len(self.actions))
+
+    def take(self, end):
+        due = {}
+        for square, s in self.actions[self.position:end]:
+            due[square] = s
+        self.position = max(self.position, end)
+        return list(due.items())
@@ -0,0 +1,81 @@
+"""
+Per-phase profiling of the solvers.
+
+A Profiler replaces the phase methods of one solver instance with timed
+wrappers, and the frontier solver adds its counters to it. Solvers are only
+instrumented when they are given a profiler, so an unprofiled game runs the
+plain methods and pays nothing.
+"""
+import time
+
+# solver methods that are timed
+PHASES = ["uncover_square", "simplify_constraints", "search"]
+
+# counters filled in by the frontier solver: the frontier components solved,
+# the search states explored and the solutions counted
+COUNTERS = ["components", "search nodes", "solutions"]
+
+PROFILE_HEADERS = ([f"{phase} calls" for phase in PHASES] +
+                   [f"{phase} seconds" for phase in PHASES] + COUNTERS)
+
+
+class Profiler():
+    """
+    Call counts and time spent in each phase of one game, plus the counters
+    of COUNTERS.
+    """
+
+    def __init__(self):
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def wrap(self, phase, method):
+        """
+        Returns method wrapped so that its calls and time count toward phase.
+        """
+        calls = self.calls
+        seconds = self.seconds
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds[phase] += time.perf_counter() - start
+                calls[phase] += 1
+        return timed
+
+    def instrument(self, solver):
+        """
+        Times the PHASES methods of solver, on that instance only.
+        """
+        for phase in PHASES:
+            setattr(solver, phase, self.wrap(phase, getattr(solver, phase)))
+
+    def as_dict(self):
+        """
+        Returns the profile as a flat dictionary with the keys of
+        PROFILE_HEADERS.
+        """
+        profile = {}
+        for phase in PHASES:
+            profile[f"{phase} calls"] = self.calls[phase]
+        for phase in PHASES:
+            profile[f"{phase} seconds"] = self.seconds[phase]
+        profile.update(self.counters)
+        return profile
+
+
+def sum_profiles(profiles):
+    """
+    Returns the sum of a list of profiles from Profiler.as_dict.
+    """
+    total = dict.fromkeys(PROFILE_HEADERS, 0)
+    for profile in profiles:
+        for key in PROFILE_HEADERS:
+            total[key] += profile[key]
+    return total
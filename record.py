@@ -0,0 +1,265 @@
+"""
+Recorded computer games.
+
+A record holds everything needed to reproduce a headless game: its settings
+and seed, the board and mine layout, the ordered solver actions and the
+outcome. Records are stored one per line as JSON (JSONL), written
+canonically (sorted keys, no spaces), so a replayed game can be compared to
+its record byte for byte.
+
+Squares are stored as row-major indices. In "actions", an uncovered square
+is stored as its index i and a flagged square as ~i (that is, -i - 1).
+
+    python3 record.py record -d hard -n 1000 -o data/hard-games.jsonl
+    python3 record.py check data/hard-games.jsonl
+
+A record is replayed on its recorded mine layout and starting square, with
+the solver's guesses drawn from its seed, so a change to the solver shows up
+as different actions. Whether the seed still generates the recorded layout
+is checked and reported on its own, so a change to the board generator is
+not mistaken for a change to the solver.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmark import (BACKENDS, board_size_arg, new_game, seed_arg,
+                       seeded_layout)
+
+RECORD_VERSION = 1
+
+
+def encode_actions(actions, cols):
+    """
+    Encodes a list of ((x, y), s) solver actions as a list of integers.
+    """
+    encoded = []
+    for (x, y), s in actions:
+        i = x * cols + y
+        encoded.append(~i if s == "flag" else i)
+    return encoded
+
+
+def decode_actions(encoded, cols):
+    """
+    Returns the ((x, y), s) solver actions of a list from encode_actions.
+    """
+    actions = []
+    for i in encoded:
+        if i < 0:
+            actions.append((divmod(~i, cols), "flag"))
+        else:
+            actions.append((divmod(i, cols), "uncover"))
+    return actions
+
+
+def record_game(difficulty, seed, backend="csp", generator="random",
+                layout=None, start=None):
+    """
+    Plays the headless game of benchmark.new_game and returns its record.
+    layout and start are passed to new_game as its bomb_positions and start.
+    """
+    solver, bomb_positions = new_game(difficulty, seed, backend, generator,
+                                      record_actions=True,
+                                      bomb_positions=layout, start=start)
+    solver.start_game()
+    board = solver.board
+    x, y = board.starting_point
+    return {
+        "version": RECORD_VERSION,
+        "difficulty": difficulty,
+        "seed": seed,
+        "backend": backend,
+        "generator": generator,
+        "rows": board.rows,
+        "cols": board.cols,
+        "num_mines": board.num_mines,
+        "mines": sorted(x * board.cols + y for x, y in bomb_positions),
+        "start": x * board.cols + y,
+        "actions": encode_actions(solver.actions, board.cols),
+        "result": "W" if solver.won_game() else "L",
+        "guesses": solver.num_guesses,
+        "search_size": solver.search_size
+    }
+
+
+def replay_record(record, backend=None):
+    """
+    Plays the game of record again on its recorded mine layout and starting
+    square, with backend if given, and returns the new record. A
+    deterministic solver returns an identical record.
+    """
+    if record["version"] != RECORD_VERSION:
+        raise ValueError(f"unsupported record version {record['version']}")
+    return record_game(record["difficulty"], record["seed"],
+                       backend or record["backend"], record["generator"],
+                       bomb_positions(record), starting_point(record))
+
+
+def check_layout(record):
+    """
+    Returns True if the seed of record still generates its mine layout and
+    starting square.
+    """
+    rows = record["rows"]
+    cols = record["cols"]
+    layout = seeded_layout(rows, cols, record["num_mines"], record["seed"],
+                           record["generator"])
+    board_class, _ = BACKENDS[record["backend"]]
+    board = board_class(rows, cols, record["num_mines"])
+    board.create_layout(layout)
+    board.uncover_first_non_bomb_tile()
+    x, y = board.starting_point
+    return sorted(x * cols + y for x, y in layout) == record["mines"] and \
+        x * cols + y == record["start"]
+
+
+def first_difference(a, b):
+    """
+    Returns the index of the first difference between lists a and b, or None
+    if they are equal.
+    """
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return i
+    return None if len(a) == len(b) else min(len(a), len(b))
+
+
+def bomb_positions(record):
+    """
+    Returns the set of (row, col) mine positions of record.
+    """
+    return {divmod(i, record["cols"]) for i in record["mines"]}
+
+
+def starting_point(record):
+    """
+    Returns the (row, col) starting square of record.
+    """
+    return divmod(record["start"], record["cols"])
+
+
+def dump_record(record):
+    """
+    Returns the canonical JSON line of record, without the newline.
+    """
+    return json.dumps(record, sort_keys=True, separators=(",", ":"))
+
+
+def write_records(filename, records):
+    """
+    Writes records to filename as JSONL, creating its directory if needed.
+    """
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    with open(filename, mode="w", encoding="utf-8") as file:
+        for record in records:
+            file.write(dump_record(record) + "\n")
+
+
+def read_records(filename):
+    """
+    Yields the records of a JSONL file.
+    """
+    with open(filename, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def check_record(line):
+    """
+    Checks the record on line. Returns (layout_matches, replay_matches,
+    action): whether its seed still generates its layout, whether its replay
+    is byte-identical to line, and the index of the first action of the
+    replay that differs from the record, or None.
+    """
+    record = json.loads(line)
+    replay = replay_record(record)
+    return (check_layout(record), dump_record(replay) == line,
+            first_difference(record["actions"], replay["actions"]))
+
+
+def check_records(filename, workers=1):
+    """
+    Checks every record of filename with check_record. Returns
+    (layout_mismatches, solver_mismatches): the line numbers of the records
+    whose seed no longer generates their layout, and a list of (line number,
+    first differing action or None) for the records whose replay is not
+    byte-identical to the recorded line.
+    """
+    with open(filename, encoding="utf-8") as file:
+        lines = [(i + 1, line.rstrip("\n")) for i, line in enumerate(file)
+                 if line.strip()]
+    texts = [line for _, line in lines]
+    if workers == 1:
+        results = list(map(check_record, texts))
+    else:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=sys.setrecursionlimit,
+                                 initargs=(10000,)) as executor:
+            results = list(executor.map(check_record, texts, chunksize=64))
+    layout_mismatches = []
+    solver_mismatches = []
+    for (number, _), (layout_matches, replay_matches, action) in zip(
+            lines, results):
+        if not layout_matches:
+            layout_mismatches.append(number)
+        if not replay_matches:
+            solver_mismatches.append((number, action))
+    return layout_mismatches, solver_mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Record seeded headless computer games, or check that "
+                    "recorded games replay identically.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="record games")
+    record_parser.add_argument("-n", "--games", type=int, default=1000)
+    record_parser.add_argument("-d", "--difficulty", type=board_size_arg,
+                               default="hard")
+    record_parser.add_argument("-s", "--seed", type=seed_arg, default=0,
+                               help="seed of the first game")
+    record_parser.add_argument("-b", "--backend", choices=list(BACKENDS),
+                               default="csp")
+    record_parser.add_argument("-g", "--generator",
+                               choices=["random", "numpy"], default="random")
+    record_parser.add_argument("-o", "--output", required=True)
+
+    check_parser = commands.add_parser(
+        "check", help="replay recorded games and compare them to the records")
+    check_parser.add_argument("filename")
+    check_parser.add_argument("-j", "--workers", type=int, default=1,
+                              help="number of worker processes (0 for one "
+                                   "per core)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        write_records(args.output,
+                      (record_game(args.difficulty, args.seed + i,
+                                   args.backend, args.generator)
+                       for i in range(args.games)))
+        return 0
+    layout_mismatches, solver_mismatches = check_records(
+        args.filename, args.workers or None)
+    for i in layout_mismatches:
+        print(f"{args.filename}:{i}: the seed no longer generates the "
+              "recorded mine layout")
+    for i, action in solver_mismatches:
+        if action is None:
+            print(f"{args.filename}:{i}: same actions, but the replay "
+                  "differs from the record")
+        else:
+            print(f"{args.filename}:{i}: replay differs from the record from "
+                  f"action {action}")
+    print(f"{len(layout_mismatches)} layout mismatches, "
+          f"{len(solver_mismatches)} solver mismatches")
+    return 1 if layout_mismatches or solver_mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    sys.exit(main())
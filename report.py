@@ -0,0 +1,275 @@
+"""
+Benchmark reports.
+
+Summarizes the stats CSVs of a benchmark run: latency percentiles, win rates
+with bootstrap confidence intervals and latency histograms per difficulty.
+Two runs can be compared, flagging the differences in win rate or speed that
+are statistically significant.
+
+    python3 report.py data --charts charts
+    python3 report.py new-data --compare old-data
+"""
+import argparse
+import os
+import random
+import sys
+from math import erfc, floor, log, sqrt
+
+from stats import DIFFICULTIES, load_stats, summarize
+
+# number of bootstrap resamples of the win rate
+BOOTSTRAP_RESAMPLES = 2000
+
+# significance level of the comparison of two runs
+ALPHA = 0.05
+
+# number of bars of a latency histogram
+HISTOGRAM_BINS = 50
+
+
+def sample_binomial(rng, n, p):
+    """
+    Returns a random number of successes out of n trials of probability p.
+    Large samples use the normal approximation, and small ones count the
+    rarer outcome with geometric jumps, so a draw never costs O(n).
+    """
+    q = min(p, 1 - p)
+    if q == 0:
+        return round(n * p)
+    if n * q * (1 - q) > 25:
+        k = round(rng.gauss(n * p, sqrt(n * p * (1 - p))))
+        return min(n, max(0, k))
+    k = 0
+    i = -1
+    log_q = log(1 - q)
+    while True:
+        i += floor(log(1 - rng.random()) / log_q) + 1
+        if i >= n:
+            break
+        k += 1
+    return k if q == p else n - k
+
+
+def bootstrap_win_rate(wins, games, confidence=0.95,
+                       resamples=BOOTSTRAP_RESAMPLES, seed=0):
+    """
+    Returns the percentile bootstrap confidence interval (low, high) of the
+    win rate, in percent, of a run of games with wins wins. Resampling games
+    with replacement gives a binomial number of wins, which is drawn
+    directly rather than by resampling each game.
+    """
+    if games == 0:
+        return None, None
+    rng = random.Random(seed)
+    p = wins / games
+    rates = sorted(100 * sample_binomial(rng, games, p) / games
+                   for _ in range(resamples))
+    tail = (1 - confidence) / 2
+    low = rates[int(tail * (resamples - 1))]
+    high = rates[int(round((1 - tail) * (resamples - 1)))]
+    return low, high
+
+
+def two_proportion_test(wins_a, games_a, wins_b, games_b):
+    """
+    Returns the two-sided p-value of the hypothesis that two runs have the
+    same win rate (pooled two-proportion z-test).
+    """
+    if games_a == 0 or games_b == 0:
+        return 1.0
+    pooled = (wins_a + wins_b) / (games_a + games_b)
+    variance = pooled * (1 - pooled) * (1 / games_a + 1 / games_b)
+    if variance == 0:
+        return 1.0
+    z = (wins_b / games_b - wins_a / games_a) / sqrt(variance)
+    return erfc(abs(z) / sqrt(2))
+
+
+def mann_whitney_test(a, b):
+    """
+    Returns the two-sided p-value of the Mann-Whitney U test that samples a
+    and b come from the same distribution, with the normal approximation and
+    a correction for ties.
+    """
+    n_a = len(a)
+    n_b = len(b)
+    if n_a == 0 or n_b == 0:
+        return 1.0
+    values = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    n = n_a + n_b
+    rank_sum_a = 0.0
+    tie_term = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[j + 1][0] == values[i][0]:
+            j += 1
+        # ranks i + 1 to j + 1 are tied and share their mean
+        rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        for k in range(i, j + 1):
+            if values[k][1] == 0:
+                rank_sum_a += rank
+        i = j + 1
+    u = rank_sum_a - n_a * (n_a + 1) / 2
+    mean = n_a * n_b / 2
+    variance = n_a * n_b / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean) / sqrt(variance)
+    return erfc(abs(z) / sqrt(2))
+
+
+def format_time(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1:
+        return f"{seconds * 1000:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def format_report(tables):
+    """
+    Returns the report of a run, given as a dictionary mapping each
+    difficulty to its StatsTable, as a list of lines.
+    """
+    lines = [f"{'difficulty':<12}{'games':>8}  {'win rate (95% CI)':<24}"
+             f"{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}{'guesses':>9}"]
+    for difficulty, table in tables.items():
+        summary = summarize(table)
+        if not summary["games"]:
+            lines.append(f"{difficulty:<12}{0:>8}")
+            continue
+        low, high = bootstrap_win_rate(summary["wins"], summary["games"])
+        win_rate = f"{summary['win_rate']:.1f}% ({low:.1f}-{high:.1f})"
+        guesses = summary["mean_guesses"]
+        lines.append(f"{difficulty:<12}{summary['games']:>8}  {win_rate:<24}"
+                     f"{format_time(summary['p50_time']):>10}"
+                     f"{format_time(summary['p90_time']):>10}"
+                     f"{format_time(summary['p99_time']):>10}"
+                     f"{format_time(summary['max_time']):>10}"
+                     f"{'-' if guesses is None else f'{guesses:.2f}':>9}")
+    return lines
+
+
+def compare_runs(old_tables, new_tables, alpha=ALPHA):
+    """
+    Compares the difficulties present in both runs. Returns a list of
+    (difficulty, description, p_value, flag) rows for the win rate and the
+    solve time of each, where flag is "REGRESSION", "improvement" or "" if
+    the difference is not significant at level alpha.
+    """
+    rows = []
+    for difficulty in old_tables:
+        if difficulty not in new_tables:
+            continue
+        old = summarize(old_tables[difficulty])
+        new = summarize(new_tables[difficulty])
+        if not old["games"] or not new["games"]:
+            continue
+        p = two_proportion_test(old["wins"], old["games"],
+                                new["wins"], new["games"])
+        flag = ""
+        if p < alpha:
+            flag = "REGRESSION" if new["win_rate"] < old["win_rate"] \
+                else "improvement"
+        rows.append((difficulty,
+                     f"win rate {old['win_rate']:.1f}% -> "
+                     f"{new['win_rate']:.1f}%", p, flag))
+
+        p = mann_whitney_test(old_tables[difficulty].times,
+                              new_tables[difficulty].times)
+        flag = ""
+        if p < alpha:
+            flag = "REGRESSION" if new["p50_time"] > old["p50_time"] \
+                else "improvement"
+        rows.append((difficulty,
+                     f"p50 time {format_time(old['p50_time'])} -> "
+                     f"{format_time(new['p50_time'])}, "
+                     f"p99 {format_time(old['p99_time'])} -> "
+                     f"{format_time(new['p99_time'])}", p, flag))
+    return rows
+
+
+def create_charts(tables, directory):
+    """
+    Saves a latency histogram per difficulty, <difficulty>-latency.png, and
+    a chart of the win rates with their confidence intervals, win-rates.png,
+    to directory. The axes follow the data, so any number of games fits.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    os.makedirs(directory, exist_ok=True)
+    for difficulty, table in tables.items():
+        if not len(table):
+            continue
+        plt.figure()
+        plt.hist([t * 1000 for t in table.times], bins=HISTOGRAM_BINS)
+        plt.title(f"Solve Time, {difficulty.capitalize()} "
+                  f"({len(table)} games)")
+        plt.xlabel("Time (ms)")
+        plt.ylabel("Games")
+        plt.savefig(f"{directory}/{difficulty}-latency")
+        plt.close()
+
+    names = []
+    rates = []
+    errors = [[], []]
+    for difficulty, table in tables.items():
+        summary = summarize(table)
+        if not summary["games"]:
+            continue
+        low, high = bootstrap_win_rate(summary["wins"], summary["games"])
+        names.append(f"{difficulty.capitalize()}\n({summary['games']} games)")
+        rates.append(summary["win_rate"])
+        errors[0].append(summary["win_rate"] - low)
+        errors[1].append(high - summary["win_rate"])
+    plt.figure()
+    plt.bar(names, rates, yerr=errors, capsize=6)
+    plt.ylim((0, 100))
+    plt.title("Win Rate with 95% Confidence Interval")
+    plt.xlabel("Difficulty")
+    plt.ylabel("Win Rate (%)")
+    plt.savefig(f"{directory}/win-rates")
+    plt.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Report on the stats CSVs of a benchmark run, or "
+                    "compare two runs.")
+    parser.add_argument("directory", nargs="?", default="data",
+                        help="directory of the <difficulty>-stats.csv files")
+    parser.add_argument("-d", "--difficulty", nargs="+", default=DIFFICULTIES)
+    parser.add_argument("-c", "--compare", metavar="OLD_DIRECTORY",
+                        help="flag significant changes from this older run")
+    parser.add_argument("--alpha", type=float, default=ALPHA,
+                        help="significance level of the comparison")
+    parser.add_argument("--charts", metavar="DIRECTORY",
+                        help="save charts there (requires matplotlib)")
+    args = parser.parse_args(argv)
+
+    tables = load_stats(args.difficulty, args.directory)
+    for line in format_report(tables):
+        print(line)
+    if args.charts:
+        create_charts(tables, args.charts)
+
+    if args.compare:
+        old_tables = load_stats(args.difficulty, args.compare)
+        print()
+        print(f"{args.compare} -> {args.directory}:")
+        regressions = 0
+        for difficulty, description, p, flag in compare_runs(
+                old_tables, tables, args.alpha):
+            print(f"  {difficulty:<10}{description:<52} p={p:.3g} {flag}")
+            regressions += flag == "REGRESSION"
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Monte Carlo estimates of mine probabilities.
+
+Components too large to count are estimated from mine configurations drawn
+by sequential importance sampling. The squares are assigned in order, and a
+square is only made a mine (or safe) if every constraint it belongs to can
+still be met, so every completed draw is consistent. Where both values are
+possible the square is a mine with the mean of the densities its constraints
+still need, and the draw is weighted by the ratio of its probability under
+the target, where each configuration with k mines has weight
+(density / (1 - density)) ** k as in frontier.solve_component, to its
+probability under those choices.
+
+The probability of each square is the weighted mean of the draws, with the
+standard error of that ratio estimate. Draws come in batches, drawn in pure
+Python or, if asked for, as NumPy arrays with one row per draw, and stop
+once every standard error is small enough or the search budget has run out.
+The two draw different random streams, so only one of them can reproduce a
+seeded game: the pure-Python one is the default and needs no NumPy.
+"""
+import random
+import time
+from math import exp, log, sqrt
+
+# largest number of draws of one component, and draws per batch
+SAMPLES = 1000
+BATCH_SIZE = 250
+
+# sampling stops once the standard error of every square is below this,
+# and the weights are even enough to be worth that many equal draws
+TARGET_ERROR = 0.02
+MIN_EFFECTIVE_SAMPLES = 100
+
+# fewer effective draws than this are too few to estimate from
+MIN_SAMPLES = 20
+
+SAMPLER_SEED = 0
+
+
+def prepare(cells, constraints):
+    """
+    Returns, for each square of cells in order, the indices of the
+    constraints it belongs to and the number of their squares that come
+    after it, and the constants of the constraints.
+    """
+    index = {cell: i for i, cell in enumerate(cells)}
+    var_constraints = [[] for _ in cells]
+    var_after = [[] for _ in cells]
+    counts = []
+    for ci, (cs, count) in enumerate(constraints):
+        positions = sorted(index[cell] for cell in cs)
+        for j, p in enumerate(positions):
+            var_constraints[p].append(ci)
+            var_after[p].append(len(positions) - j - 1)
+        counts.append(count)
+    return var_constraints, var_after, counts
+
+
+def sample_batch(prepared, n, density, size, rng, deadline=None):
+    """
+    Draws size configurations in pure Python, or fewer if the
+    time.perf_counter() deadline passes. Returns (shift, w, w2, wx, w2x):
+    the largest log weight, and the sums of the weights, of their squares,
+    and of both over the draws where each square is a mine, with weights
+    divided by exp(shift).
+    """
+    var_constraints, var_after, counts = prepared
+    log_mine = log(density)
+    log_safe = log(1 - density)
+    log_weights = []
+    draws = []
+    for _ in range(size):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        remaining = list(counts)
+        log_weight = 0.0
+        mines = []
+        for v in range(n):
+            cs = var_constraints[v]
+            after = var_after[v]
+            can_mine = True
+            can_safe = True
+            q = 0.0
+            for c, a in zip(cs, after):
+                r = remaining[c]
+                if r < 1:
+                    can_mine = False
+                if r > a:
+                    can_safe = False
+                q += r / (a + 1)
+            if can_mine and can_safe:
+                q /= len(cs)
+                if rng.random() < q:
+                    x = 1
+                    log_weight += log_mine - log(q)
+                else:
+                    x = 0
+                    log_weight += log_safe - log(1 - q)
+            elif can_mine:
+                x = 1
+                log_weight += log_mine
+            elif can_safe:
+                x = 0
+                log_weight += log_safe
+            else:
+                break
+            if x:
+                mines.append(v)
+                for c in cs:
+                    remaining[c] -= 1
+        else:
+            log_weights.append(log_weight)
+            draws.append(mines)
+    if not log_weights:
+        return None
+    shift = max(log_weights)
+    w = 0.0
+    w2 = 0.0
+    wx = [0.0] * n
+    w2x = [0.0] * n
+    for log_weight, mines in zip(log_weights, draws):
+        weight = exp(log_weight - shift)
+        w += weight
+        w2 += weight * weight
+        for v in mines:
+            wx[v] += weight
+            w2x[v] += weight * weight
+    return shift, w, w2, wx, w2x
+
+
+def sample_batch_numpy(prepared, n, density, size, rng, deadline=None):
+    """
+    Same as sample_batch, with one row per draw in NumPy arrays, so each
+    square is assigned in every draw of the batch at once and the deadline
+    is not checked within a batch. rng is a numpy.random.Generator.
+    """
+    import numpy as np
+
+    var_constraints, var_after, counts = prepared
+    remaining = np.tile(np.array(counts, dtype=np.int64), (size, 1))
+    log_weights = np.zeros(size)
+    alive = np.ones(size, dtype=bool)
+    draws = np.zeros((size, n), dtype=bool)
+    log_mine = log(density)
+    log_safe = log(1 - density)
+    for v in range(n):
+        cs = np.array(var_constraints[v])
+        after = np.array(var_after[v])
+        r = remaining[:, cs]
+        can_mine = (r >= 1).all(axis=1)
+        can_safe = (r <= after).all(axis=1)
+        both = can_mine & can_safe
+        q = np.clip((r / (after + 1)).mean(axis=1), 1e-12, 1 - 1e-12)
+        x = np.where(both, rng.random(size) < q, can_mine)
+        log_weights += np.where(
+            both,
+            np.where(x, log_mine - np.log(q), log_safe - np.log(1 - q)),
+            np.where(x, log_mine, log_safe))
+        alive &= can_mine | can_safe
+        remaining[:, cs] -= x[:, np.newaxis]
+        draws[:, v] = x
+    if not alive.any():
+        return None
+    log_weights = log_weights[alive]
+    draws = draws[alive]
+    shift = log_weights.max()
+    weights = np.exp(log_weights - shift)
+    squared = weights * weights
+    return (float(shift), float(weights.sum()), float(squared.sum()),
+            (weights @ draws).tolist(), (squared @ draws).tolist())
+
+
+def sample_component(cells, constraints, density, samples=SAMPLES,
+                     batch_size=BATCH_SIZE, target_error=TARGET_ERROR,
+                     seed=SAMPLER_SEED, vectorized=False, budget=None):
+    """
+    Estimates the mine probability of every square of a component, with the
+    squares outside it each a mine with probability density. Draws batches
+    of batch_size configurations, up to samples, until every standard error
+    is below target_error, with an effective sample size (w ** 2 / w2) of
+    at least MIN_EFFECTIVE_SAMPLES. vectorized is True to draw with NumPy,
+    which must be installed, and False to draw in pure Python. If
+    a budget.SearchBudget is given, each draw spends one state per square
+    from it, and sampling stops once it runs out.
+
+    Returns (probabilities, errors), dictionaries mapping each square to its
+    estimated probability and the standard error of the estimate, or None
+    if the consistent draws are worth fewer than MIN_SAMPLES equal draws.
+    """
+    if vectorized:
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        draw = sample_batch_numpy
+    else:
+        rng = random.Random(seed)
+        draw = sample_batch
+    density = min(max(density, 1e-9), 1 - 1e-9)
+    n = len(cells)
+    prepared = prepare(cells, constraints)
+
+    shift = None
+    w = 0.0
+    w2 = 0.0
+    wx = [0.0] * n
+    w2x = [0.0] * n
+    deadline = None if budget is None else budget.deadline
+    drawn = 0
+    while drawn < samples:
+        size = min(batch_size, samples - drawn)
+        if budget is not None:
+            size = budget.draws(size, n)
+            if not size:
+                break
+        drawn += size
+        batch = draw(prepared, n, density, size, rng, deadline)
+        if batch is None:
+            continue
+        # bring both sums to the larger of the two shifts
+        batch_shift, batch_w, batch_w2, batch_wx, batch_w2x = batch
+        if shift is None or batch_shift > shift:
+            scale = exp(shift - batch_shift) if shift is not None else 0.0
+            shift = batch_shift
+            batch_scale = 1.0
+        else:
+            scale = 1.0
+            batch_scale = exp(batch_shift - shift)
+        w = w * scale + batch_w * batch_scale
+        w2 = w2 * scale * scale + batch_w2 * batch_scale * batch_scale
+        for v in range(n):
+            wx[v] = wx[v] * scale + batch_wx[v] * batch_scale
+            w2x[v] = w2x[v] * scale * scale + \
+                batch_w2x[v] * batch_scale * batch_scale
+
+        probabilities, errors = estimate(cells, w, w2, wx, w2x)
+        if max(errors.values()) <= target_error and \
+                w * w / w2 >= MIN_EFFECTIVE_SAMPLES:
+            break
+    if shift is None or w * w / w2 < MIN_SAMPLES:
+        return None
+    return probabilities, errors
+
+
+def estimate(cells, w, w2, wx, w2x):
+    """
+    Returns the weighted means of the draws and their standard errors, from
+    the sums of sample_batch.
+    """
+    probabilities = {}
+    errors = {}
+    for v, cell in enumerate(cells):
+        p = wx[v] / w
+        variance = w2x[v] * (1 - 2 * p) + p * p * w2
+        probabilities[cell] = p
+        errors[cell] = sqrt(max(variance, 0.0)) / w
+    return probabilities, errors
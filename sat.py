@@ -0,0 +1,304 @@
+"""
+Satisfiability backend of the solver.
+
+The frontier is encoded as cardinality constraints over one boolean variable
+per square (true for a mine): every constraint of the store says that exactly
+its constant of its squares are mines, and the global mine count says that
+the frontier holds at most the mines left and at least those that do not fit
+in the interior. A square is provably safe (or a mine) if the encoding has no
+model where it is a mine (or safe). Each component of the frontier is
+decided on its own: starting from one model, only the squares that every
+model found so far agrees on are tested, each with one solver call under an
+assumption, and every square proved is added to the solver as a fact for the
+calls that follow.
+
+The engine is PySAT (https://pysathq.github.io) if it is installed, with the
+constraints encoded as clauses by sequential counters, or a pure-Python DPLL
+solver that propagates the cardinality constraints directly.
+
+A budget.SearchBudget bounds the proofs like the counting: the DPLL solver
+spends one search state per decision, and PySAT one per solver call, which
+is not interrupted once started.
+"""
+from budget import BudgetExceeded
+from csp import MSCSP
+from frontier import get_components
+
+ENGINES = ["auto", "python", "pysat"]
+
+
+class CardinalitySolver():
+    """
+    Pure-Python DPLL solver of cardinality constraints: each constraint says
+    that between lo and hi of its variables are true. A constraint with as
+    many true variables as hi sets the others to false, one that needs all
+    its free variables to reach lo sets them to true, and variables are
+    decided in order, false first. Every decision is spent from budget, if
+    one is given.
+    """
+
+    def __init__(self, num_vars, budget=None):
+        self.num_vars = num_vars
+        self.budget = budget
+        # (variables, lo, hi)
+        self.constraints = []
+        self.var_constraints = [[] for _ in range(num_vars)]
+
+    def add_constraint(self, variables, lo, hi):
+        index = len(self.constraints)
+        self.constraints.append((variables, lo, hi))
+        for v in variables:
+            self.var_constraints[v].append(index)
+
+    def fix(self, v, value):
+        self.add_constraint([v], int(value), int(value))
+
+    def solve(self, assumptions=()):
+        """
+        Returns a model satisfying the constraints and the (variable, value)
+        pairs of assumptions, as a list of booleans, or None if there is
+        none.
+        """
+        constraints = self.constraints
+        var_constraints = self.var_constraints
+        values = [None] * self.num_vars
+        true = [0] * len(constraints)
+        free = [len(variables) for variables, _, _ in constraints]
+        trail = []
+
+        def assign(v, value):
+            values[v] = value
+            trail.append(v)
+            for c in var_constraints[v]:
+                free[c] -= 1
+                if value:
+                    true[c] += 1
+            queue.extend(var_constraints[v])
+
+        def undo(mark):
+            while len(trail) > mark:
+                v = trail.pop()
+                for c in var_constraints[v]:
+                    free[c] += 1
+                    if values[v]:
+                        true[c] -= 1
+                values[v] = None
+
+        def propagate():
+            while queue:
+                c = queue.pop()
+                variables, lo, hi = constraints[c]
+                t = true[c]
+                u = free[c]
+                if t > hi or t + u < lo:
+                    queue.clear()
+                    return False
+                if u == 0:
+                    continue
+                if t == hi:
+                    value = False
+                elif t + u == lo:
+                    value = True
+                else:
+                    continue
+                for v in variables:
+                    if values[v] is None:
+                        assign(v, value)
+            return True
+
+        queue = list(range(len(constraints)))
+        for v, value in assumptions:
+            if values[v] is None:
+                assign(v, value)
+            elif values[v] != value:
+                return None
+        if not propagate():
+            return None
+
+        # (trail length before the decision, variable, value)
+        decisions = []
+        budget = self.budget
+        while True:
+            v = next((v for v in range(self.num_vars) if values[v] is None),
+                     None)
+            if v is None:
+                return values
+            if budget is not None:
+                budget.spend()
+            decisions.append((len(trail), v, False))
+            assign(v, False)
+            while not propagate():
+                while decisions:
+                    mark, v, value = decisions.pop()
+                    undo(mark)
+                    if not value:
+                        decisions.append((mark, v, True))
+                        assign(v, True)
+                        break
+                else:
+                    return None
+
+    def close(self):
+        pass
+
+
+class PySATSolver():
+    """
+    Same interface as CardinalitySolver, on an incremental PySAT solver.
+    Every solver call is spent from budget, if one is given.
+    """
+
+    def __init__(self, num_vars, budget=None):
+        from pysat.solvers import Solver
+        self.num_vars = num_vars
+        self.budget = budget
+        self.solver = Solver(name="g4")
+        # largest variable number used by the encodings
+        self.top_id = num_vars
+        self.unsatisfiable = False
+
+    def add_constraint(self, variables, lo, hi):
+        from pysat.card import CardEnc, EncType
+        lits = [v + 1 for v in variables]
+        if lo > len(lits) or hi < 0:
+            self.unsatisfiable = True
+            return
+        if hi < len(lits):
+            cnf = CardEnc.atmost(lits, bound=hi, top_id=self.top_id,
+                                 encoding=EncType.seqcounter)
+            self.top_id = max(self.top_id, cnf.nv)
+            self.solver.append_formula(cnf.clauses)
+        if lo > 0:
+            cnf = CardEnc.atleast(lits, bound=lo, top_id=self.top_id,
+                                  encoding=EncType.seqcounter)
+            self.top_id = max(self.top_id, cnf.nv)
+            self.solver.append_formula(cnf.clauses)
+
+    def fix(self, v, value):
+        self.solver.add_clause([v + 1 if value else -(v + 1)])
+
+    def solve(self, assumptions=()):
+        if self.unsatisfiable:
+            return None
+        if self.budget is not None:
+            self.budget.spend()
+        lits = [v + 1 if value else -(v + 1) for v, value in assumptions]
+        if not self.solver.solve(assumptions=lits):
+            return None
+        model = self.solver.get_model()
+        values = [False] * self.num_vars
+        for lit in model:
+            if 0 < lit <= self.num_vars:
+                values[lit - 1] = True
+        return values
+
+    def close(self):
+        self.solver.delete()
+
+
+def new_engine(engine, num_vars, budget=None):
+    """
+    Returns a solver of num_vars variables that spends budget: "python" for
+    a CardinalitySolver, "pysat" for a PySATSolver, or "auto" for PySAT if
+    it is installed.
+    """
+    if engine == "auto":
+        try:
+            import pysat.solvers  # noqa: F401
+            engine = "pysat"
+        except ImportError:
+            engine = "python"
+    if engine == "pysat":
+        return PySATSolver(num_vars, budget)
+    if engine == "python":
+        return CardinalitySolver(num_vars, budget)
+    raise ValueError(f"unknown SAT engine {engine!r}")
+
+
+def forced_squares(constraints, mines_left, num_interior, engine="auto",
+                   budget=None):
+    """
+    Returns (safe, mines), the frontier squares of constraints that are safe
+    or mines in every assignment consistent with the constraints and the
+    global mine count, or None if there is no such assignment. Components
+    are decided one at a time, each with the bounds that the global mine
+    count puts on it whatever the other components hold, so a square only
+    forced by the exact count of another component is not found. Raises
+    budget.BudgetExceeded if budget runs out.
+    """
+    components = get_components(constraints)
+    num_frontier = sum(len(cells) for cells, _ in components)
+    safe = []
+    mines = []
+    for cells, component_constraints in components:
+        others = num_frontier - len(cells)
+        forced = forced_component_squares(
+            cells, component_constraints,
+            max(0, mines_left - num_interior - others), mines_left, engine,
+            budget)
+        if forced is None:
+            return None
+        safe.extend(forced[0])
+        mines.extend(forced[1])
+    return safe, mines
+
+
+def forced_component_squares(cells, constraints, min_mines, max_mines,
+                             engine="auto", budget=None):
+    """
+    Returns (safe, mines), the squares of the component cells that are safe
+    or mines in every assignment consistent with its constraints that has
+    between min_mines and max_mines mines, or None if there is none.
+    """
+    index = {cell: i for i, cell in enumerate(cells)}
+    solver = new_engine(engine, len(cells), budget)
+    try:
+        for cs, count in constraints:
+            solver.add_constraint([index[cell] for cell in cs], count, count)
+        if min_mines > 0 or max_mines < len(cells):
+            solver.add_constraint(list(range(len(cells))), min_mines,
+                                  max_mines)
+        model = solver.solve()
+        if model is None:
+            return None
+        # squares on which every model found so far agrees
+        candidates = set(range(len(cells)))
+        safe = []
+        mines = []
+        for v in range(len(cells)):
+            if v not in candidates:
+                continue
+            other = solver.solve([(v, not model[v])])
+            if other is None:
+                (mines if model[v] else safe).append(cells[v])
+                solver.fix(v, model[v])
+            else:
+                candidates = {u for u in candidates if other[u] == model[u]}
+        return safe, mines
+    finally:
+        solver.close()
+
+
+class SATSolver(MSCSP):
+    """
+    MSCSP that decides which frontier squares are provably safe or mines
+    with a SAT engine (see ENGINES) rather than by counting solutions. The
+    solutions are only counted, by MSCSP.solve, when nothing is forced and
+    a square must be guessed. The proofs and the counting share the budget
+    of the search: if the proofs run out of it, the probabilities are
+    estimated.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.engine = kwargs.get("engine", "auto")
+
+    def solve(self, constraints, mines_left, num_interior):
+        try:
+            forced = forced_squares(constraints, mines_left, num_interior,
+                                    self.engine, self.budget)
+        except BudgetExceeded:
+            forced = None
+        if forced is not None and (forced[0] or forced[1]):
+            return forced[0], forced[1], {}, None
+        return super().solve(constraints, mines_left, num_interior)
@@ -0,0 +1,64 @@
+import time
+
+from playback import ACTIONS_PER_SECOND
+
+
+def truncate_decimal(s, n):
+    """
+    Truncates the decimal represented by string s to n decimal places.
+    n must be less than or equal to the number of digits appearing after the
+    decimal point.
+    """
+    index_of_decimal = s.index(".")
+    begin = s[:index_of_decimal+1]
+    end = s[index_of_decimal+1:]
+    after_decimal = ""
+
+    i = 0
+    while len(after_decimal) < n:
+        after_decimal += end[i]
+        i += 1
+
+    return begin + after_decimal
+
+
+class MSSession():
+    """
+    State of one game session: the chosen difficulty and game mode, the seed
+    of the current board, the replay speed of computer games (actions per
+    second, None for instant), when the current game started and how many
+    safe squares are still covered. solve_time is the time the computer took
+    to solve the current game, without the animation. Each game owns its
+    session, so several games can run in one process.
+    """
+
+    def __init__(self, **kwargs):
+        self.difficulty = kwargs.get("difficulty")
+        self.gamemode = kwargs.get("gamemode")
+        self.seed = kwargs.get("seed")
+        self.playback_speed = kwargs.get("playback_speed", ACTIONS_PER_SECOND)
+        self.start_time = None
+        self.safe_tiles_covered = None
+        self.solve_time = None
+
+    def start(self, rows, cols, num_mines):
+        self.start_time = time.time()
+        self.solve_time = None
+        self.safe_tiles_covered = (rows * cols) - num_mines
+
+    def uncover_safe_tile(self):
+        """
+        Records that one more safe square was uncovered. Returns True once no
+        safe square is left covered.
+        """
+        self.safe_tiles_covered -= 1
+        return self.safe_tiles_covered == 0
+
+    def elapsed_time_str(self):
+        """
+        Returns the time since the game started, e.g. "12.34s" or "1.05min".
+        """
+        seconds_elapsed = time.time() - self.start_time
+        if seconds_elapsed < 60:
+            return truncate_decimal(str(seconds_elapsed), 2) + "s"
+        return truncate_decimal(str(seconds_elapsed/60.0), 2) + "min"
@@ -0,0 +1,153 @@
+"""
+Columnar statistics of benchmark results.
+
+A stats CSV is streamed once into a StatsTable, which keeps every column in a
+typed array (8 bytes per number, 1 byte per result) rather than as lists of
+strings, and the summary of a table is computed in one pass over it.
+Percentiles sort a copy of the time column.
+"""
+import csv
+from array import array
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+# header of each column read from a stats CSV; Guesses and Search Size are
+# missing from CSVs written before benchmark.py recorded them
+COLUMNS = {
+    "iterations": "Iteration",
+    "times": "Time (seconds)",
+    "results": "Result",
+    "guesses": "Guesses",
+    "search_sizes": "Search Size"
+}
+
+
+class StatsTable():
+    """
+    The results of a benchmark run, one typed array per column. wins[i] is 1
+    if game i was won. guesses and search_sizes are empty if the CSV did not
+    record them.
+    """
+
+    def __init__(self):
+        self.iterations = array("q")
+        self.times = array("d")
+        self.wins = bytearray()
+        self.guesses = array("q")
+        self.search_sizes = array("q")
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, iteration, time, won, guesses=None, search_size=None):
+        self.iterations.append(iteration)
+        self.times.append(time)
+        self.wins.append(1 if won else 0)
+        if guesses is not None:
+            self.guesses.append(guesses)
+        if search_size is not None:
+            self.search_sizes.append(search_size)
+
+
+def read_stats_csv(filename):
+    """
+    Streams the stats CSV filename, as written by benchmark.py, into a
+    StatsTable.
+    """
+    table = StatsTable()
+    with open(filename, mode="r", encoding='utf-8-sig', newline='') as file:
+        csvreader = csv.reader(file)
+        headers = next(csvreader)
+        iteration = headers.index(COLUMNS["iterations"])
+        time = headers.index(COLUMNS["times"])
+        result = headers.index(COLUMNS["results"])
+        guesses = None
+        search_size = None
+        if COLUMNS["guesses"] in headers:
+            guesses = headers.index(COLUMNS["guesses"])
+        if COLUMNS["search_sizes"] in headers:
+            search_size = headers.index(COLUMNS["search_sizes"])
+        iterations = table.iterations.append
+        times = table.times.append
+        wins = table.wins.append
+        guesses_column = table.guesses.append
+        search_sizes = table.search_sizes.append
+        for row in csvreader:
+            if not row:
+                continue
+            iterations(int(row[iteration]))
+            times(float(row[time]))
+            wins(row[result] == "W")
+            if guesses is not None:
+                guesses_column(int(row[guesses]))
+            if search_size is not None:
+                search_sizes(int(row[search_size]))
+    return table
+
+
+def percentile(sorted_values, p):
+    """
+    Returns the p-th percentile (0 <= p <= 100) of a sorted sequence, with
+    linear interpolation between the closest ranks, or None if it is empty.
+    """
+    n = len(sorted_values)
+    if n == 0:
+        return None
+    rank = (n - 1) * p / 100
+    lower = int(rank)
+    upper = min(lower + 1, n - 1)
+    fraction = rank - lower
+    return sorted_values[lower] + \
+        (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def summarize(table):
+    """
+    Returns a dictionary of statistics of a StatsTable: the number of games
+    and wins, the win rate in percent, the mean time of all games and of won
+    games, the 50th, 90th and 99th percentile and maximum time, and the mean
+    and maximum number of guesses and search size (None if not recorded).
+    """
+    games = len(table)
+    wins = 0
+    total_time = 0.0
+    win_time = 0.0
+    for time, won in zip(table.times, table.wins):
+        total_time += time
+        if won:
+            wins += 1
+            win_time += time
+    times = sorted(table.times)
+    summary = {
+        "games": games,
+        "wins": wins,
+        "win_rate": 100 * wins / games if games else None,
+        "mean_time": total_time / games if games else None,
+        "mean_win_time": win_time / wins if wins else None,
+        "p50_time": percentile(times, 50),
+        "p90_time": percentile(times, 90),
+        "p99_time": percentile(times, 99),
+        "max_time": times[-1] if times else None
+    }
+    for name, column in (("guesses", table.guesses),
+                         ("search_size", table.search_sizes)):
+        summary[f"mean_{name}"] = sum(column) / len(column) if column else None
+        summary[f"max_{name}"] = max(column) if column else None
+    return summary
+
+
+def load_stats(difficulties=DIFFICULTIES, directory="data"):
+    """
+    Reads <directory>/<difficulty>-stats.csv once for every difficulty and
+    returns a dictionary mapping each difficulty to its StatsTable.
+    """
+    return {difficulty: read_stats_csv(f"{directory}/{difficulty}-stats.csv")
+            for difficulty in difficulties}
+
+
+def summarize_all(tables):
+    """
+    Returns a dictionary mapping each difficulty of tables to its summary.
+    """
+    return {difficulty: summarize(table)
+            for difficulty, table in tables.items()}
@@ -0,0 +1,77 @@
+"""
+Brute-force references for the frontier tests: small random constraint
+systems and every assignment that satisfies them.
+"""
+from itertools import product
+
+
+def random_system(rng, rows=3, cols=4, num_constraints=5):
+    """
+    Returns the constraints of a random system over squares of a rows by
+    cols grid, consistent with a random hidden mine layout.
+    """
+    squares = [(x, y) for x in range(rows) for y in range(cols)]
+    hidden = {square for square in squares if rng.random() < 0.4}
+    constraints = []
+    for _ in range(num_constraints):
+        cs = rng.sample(squares, rng.randint(1, 4))
+        constraints.append((cs, sum(square in hidden for square in cs)))
+    return constraints
+
+
+def frontier_cells(constraints):
+    """
+    Returns the squares of constraints, each once, in order.
+    """
+    cells = {}
+    for cs, _ in constraints:
+        for cell in cs:
+            cells[cell] = None
+    return list(cells)
+
+
+def assignments(cells, constraints):
+    """
+    Yields every {square: 0 or 1} assignment of cells that satisfies
+    constraints.
+    """
+    for values in product((0, 1), repeat=len(cells)):
+        assignment = dict(zip(cells, values))
+        if all(sum(assignment[cell] for cell in cs) == count
+               for cs, count in constraints):
+            yield assignment
+
+
+def weighted_probabilities(cells, constraints, weight):
+    """
+    Returns the mine probability of every square of cells, over the
+    satisfying assignments weighted by weight(number of mines), and the
+    total weight.
+    """
+    total = 0
+    mines = dict.fromkeys(cells, 0)
+    for assignment in assignments(cells, constraints):
+        w = weight(sum(assignment.values()))
+        total += w
+        for cell, value in assignment.items():
+            mines[cell] += w * value
+    if not total:
+        return {}, 0
+    return {cell: mines[cell] / total for cell in cells}, total
+
+
+def forced(cells, constraints, min_mines=0, max_mines=None):
+    """
+    Returns (safe, mines), the sets of squares of cells that are safe or
+    mines in every satisfying assignment with between min_mines and
+    max_mines mines, or None if there is none.
+    """
+    if max_mines is None:
+        max_mines = len(cells)
+    models = [a for a in assignments(cells, constraints)
+              if min_mines <= sum(a.values()) <= max_mines]
+    if not models:
+        return None
+    safe = {cell for cell in cells if all(not a[cell] for a in models)}
+    mines = {cell for cell in cells if all(a[cell] for a in models)}
+    return safe, mines
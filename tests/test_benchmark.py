@@ -0,0 +1,48 @@
+import csv
+
+import pytest
+
+import benchmark
+from benchmark import (BACKENDS, CSV_HEADERS, main, play_game, run_benchmark,
+                       run_parallel_benchmark)
+
+
+def test_games_are_reproducible():
+    for seed in range(5):
+        first = play_game("easy", seed)
+        second = play_game("easy", seed)
+        del first["time"], second["time"]
+        assert first == second
+
+
+def test_run_benchmark_seeds():
+    results = run_benchmark("easy", 3, seed=7)
+    assert [r["result"] for r in results] == \
+        [play_game("easy", 7 + i)["result"] for i in range(3)]
+
+
+def test_stats_csv(tmp_path):
+    main(["-n", "4", "-d", "easy", "-j", "2", "-o", str(tmp_path / "out")])
+    with open(tmp_path / "out" / "easy-stats.csv", encoding="utf-8-sig") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == CSV_HEADERS
+    assert [row[0] for row in rows[1:]] == ["1", "2", "3", "4"]
+    assert all(row[2] in ("W", "L") for row in rows[1:])
+
+
+def test_negative_seed_is_rejected(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main(["-n", "1", "-s", "-1", "-o", str(tmp_path / "out")])
+    assert "seed must not be negative" in capsys.readouterr().err
+
+
+def without_times(results):
+    return [{k: v for k, v in r.items() if k != "time"} for r in results]
+
+
+def test_parallel_benchmark_matches_one_worker(monkeypatch):
+    monkeypatch.setattr(benchmark, "CHUNK_SIZE", 3)
+    for backend in BACKENDS:
+        expected = run_benchmark("easy", 10, 5, backend)
+        results = run_parallel_benchmark("easy", 10, 5, backend, workers=2)
+        assert without_times(results) == without_times(expected)
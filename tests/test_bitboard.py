@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from bitboard import (BitBoard, BitSolver, get_neighbor_masks, iter_bits,
+                      list_bits)
+from board import MSBoard, generate_bomb_positions, get_adjacent_tiles
+
+
+def test_iter_bits():
+    assert list(iter_bits(0)) == []
+    assert list(iter_bits(0b1010011)) == [0, 1, 4, 6]
+    assert list(iter_bits(1 << 200)) == [200]
+
+
+def test_list_bits():
+    assert list_bits(0) == []
+    for mask in (0b1010011, 1 << 200, (1 << 64) - 1 | 1 << 64,
+                 sum(1 << i for i in range(0, 1000, 3)) | 1 << 5000):
+        assert list_bits(mask) == list(iter_bits(mask))
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (1, 5), (4, 3), (9, 9)])
+def test_neighbor_masks_match_adjacent_tiles(rows, cols):
+    board = MSBoard(rows, cols, 0)
+    board.create_layout(set())
+    bit_board = BitBoard(rows, cols, 0)
+    masks = get_neighbor_masks(rows, cols)
+    for i in range(rows):
+        for j in range(cols):
+            expected = {(t.row_number, t.col_number)
+                        for t in get_adjacent_tiles(board, i, j)}
+            found = {divmod(k, cols)
+                     for k in iter_bits(bit_board.neighbor_mask(i * cols + j))}
+            assert found == expected
+            # masks are stored shifted, within three rows
+            assert masks[i * cols + j][1].bit_length() <= 2 * cols + 3
+
+
+def test_layout_matches_msboard():
+    bomb_positions = generate_bomb_positions(16, 30, 99, random.Random(3))
+    board = MSBoard(16, 30, 99)
+    board.create_layout(bomb_positions)
+    board.uncover_first_non_bomb_tile()
+    bit_board = BitBoard(16, 30, 99)
+    bit_board.create_layout(bomb_positions)
+    bit_board.uncover_first_non_bomb_tile()
+    assert bit_board.starting_point == board.starting_point
+    assert list(bit_board.numbers) == [square.adjacent_bombs
+                                       for row in board.grid
+                                       for square in row]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_games_end_with_consistent_actions(seed):
+    rng = random.Random(seed)
+    bomb_positions = set(generate_bomb_positions(16, 16, 40, rng))
+    board = BitBoard(16, 16, 40)
+    board.create_layout(bomb_positions)
+    board.uncover_first_non_bomb_tile()
+    solver = BitSolver(board=board, rng=rng)
+    solver.start_game()
+    uncovered = [sq for sq, s in solver.actions if s == "uncover"]
+    flagged = [sq for sq, s in solver.actions if s == "flag"]
+    assert set(flagged) <= bomb_positions
+    assert all(sq not in bomb_positions for sq in uncovered[:-1])
+    if solver.won_game():
+        assert board.is_solved()
+    else:
+        assert uncovered[-1] in bomb_positions
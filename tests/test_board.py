@@ -0,0 +1,115 @@
+import random
+import sys
+
+import pytest
+
+from benchmark import BACKENDS, new_game, play_game
+from board import (MSBoard, generate_bomb_positions, get_adjacent_tiles,
+                   get_board_size)
+from csp import MSCSP
+
+# tiny boards where only bombs have the fewest adjacent bombs
+DENSE_SIZES = ["1x5x2", "2x2x3", "5x5x24", "3x3x8"]
+
+
+def new_board(rows, cols, num_mines, seed):
+    board = MSBoard(rows, cols, num_mines)
+    rng = random.Random(seed)
+    board.create_layout(generate_bomb_positions(rows, cols, num_mines, rng))
+    board.uncover_first_non_bomb_tile()
+    return board
+
+
+def test_adjacent_bombs():
+    board = MSBoard(3, 3, 2)
+    board.create_layout({(0, 0), (2, 2)})
+    assert board.grid[1][1].adjacent_bombs == 2
+    assert board.grid[0][2].adjacent_bombs == 0
+    assert board.min_adj_bombs() == 0
+
+
+def test_adjacent_bombs_match_neighbors():
+    board = new_board(16, 30, 99, 0)
+    for row in board.grid:
+        for square in row:
+            assert square.adjacent_bombs == sum(
+                t.is_bomb for t in get_adjacent_tiles(board, square.row_number,
+                                                      square.col_number))
+
+
+def test_starting_point_is_safe():
+    for seed in range(20):
+        board = new_board(9, 9, 10, seed)
+        x, y = board.starting_point
+        assert not board.grid[x][y].is_bomb
+        assert board.grid[x][y].is_uncovered
+
+
+def test_headless_games_end():
+    for seed in range(20):
+        board = new_board(9, 9, 10, seed)
+        solver = MSCSP(board=board)
+        solver.start_game()
+        assert solver.actions
+        assert solver.won_game() == (not solver.lost_game)
+        if solver.won_game():
+            flags = {sq for sq, s in solver.actions if s == "flag"}
+            assert all(board.grid[x][y].is_bomb for x, y in flags)
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+@pytest.mark.parametrize("size", DENSE_SIZES)
+def test_dense_boards_start_on_a_safe_square(backend, size):
+    for seed in range(20):
+        solver, bomb_positions = new_game(size, seed, backend)
+        assert tuple(solver.board.starting_point) not in set(bomb_positions)
+        solver.start_game()
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_board_with_one_safe_square_is_won(backend):
+    solver, _ = new_game("5x5x24", 0, backend)
+    solver.start_game()
+    assert solver.won_game()
+
+
+@pytest.mark.parametrize("size", ["0x5x1", "2x2x4", "axbxc", "5x5"])
+def test_invalid_board_sizes(size):
+    with pytest.raises(ValueError):
+        get_board_size(size)
+
+
+def test_board_sizes():
+    assert get_board_size("hard") == (16, 30, 99)
+    assert get_board_size("3x4x5") == (3, 4, 5)
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_custom_sizes_play_on_every_backend(backend):
+    for seed in range(5):
+        result = play_game("20x40x120", seed, backend)
+        assert result["result"] in ("W", "L")
+
+
+def test_large_zero_region_opens_without_recursion():
+    board = new_board(300, 300, 200, 0)
+    solver = MSCSP(board=board)
+    x, y = board.starting_point
+    revealed = solver.reveal_region(board.grid[x][y])
+    # flood fill the zero region by hand
+    expected = {(x, y)}
+    stack = [(x, y)]
+    while stack:
+        i, j = stack.pop()
+        if board.grid[i][j].adjacent_bombs:
+            continue
+        for t in get_adjacent_tiles(board, i, j):
+            n = (t.row_number, t.col_number)
+            if n not in expected:
+                expected.add(n)
+                stack.append(n)
+    assert len(revealed) == len(set(revealed))
+    assert set(revealed) == expected
+    assert len(expected) > sys.getrecursionlimit()
+    solver = MSCSP(board=new_board(300, 300, 200, 0))
+    solver.start_game()
@@ -0,0 +1,93 @@
+import pytest
+
+from benchmark import new_game
+from budget import SAMPLE_SHARE, BudgetExceeded, SearchBudget
+
+
+def test_node_limit():
+    budget = SearchBudget(nodes=10)
+    budget.start()
+    budget.spend(10)
+    assert budget.exact
+    with pytest.raises(BudgetExceeded):
+        budget.spend()
+    assert not budget.exact
+    assert budget.exceeded == 1
+    # every later state of the same search is refused
+    with pytest.raises(BudgetExceeded):
+        budget.spend()
+    assert budget.exceeded == 1
+
+
+def test_start_begins_a_new_search():
+    budget = SearchBudget(nodes=1)
+    budget.start()
+    with pytest.raises(BudgetExceeded):
+        budget.spend(2)
+    budget.record_error(0.1)
+    budget.start()
+    assert budget.exact
+    assert budget.used == 0
+    assert budget.error is None
+    assert budget.max_error == 0.1
+    assert budget.searches == 2
+
+
+def test_time_limit():
+    budget = SearchBudget(seconds=0)
+    budget.start()
+    with pytest.raises(BudgetExceeded):
+        for _ in range(10000):
+            budget.spend()
+    assert budget.used <= 32
+    assert budget.draws(10, 1) == 0
+
+
+def test_reserve_keeps_a_share_for_sampling():
+    budget = SearchBudget(nodes=1000)
+    budget.start()
+    budget.reserve(1000 * SAMPLE_SHARE)
+    budget.spend(int(1000 * (1 - SAMPLE_SHARE)))
+    with pytest.raises(BudgetExceeded):
+        budget.spend()
+    # the rest is left to sampling
+    used = budget.used
+    assert budget.draws(1000, 10) == (1000 - used) // 10
+    assert budget.draws(1000, 10) == 0
+
+
+def test_reserve_leaves_a_small_share_to_counting():
+    budget = SearchBudget(nodes=1000)
+    budget.start()
+    budget.reserve(1000)
+    budget.spend(1000)
+    assert budget.exact
+    budget.reserve(250)
+    assert budget.count_nodes == 750
+    # a new search starts with the whole budget for counting
+    budget.start()
+    assert budget.count_nodes == 1000
+
+
+def test_record_error_keeps_the_largest():
+    budget = SearchBudget()
+    budget.start()
+    budget.record_error(0.05)
+    budget.record_error(0.01)
+    assert budget.error == 0.05
+    assert budget.max_error == 0.05
+
+
+@pytest.mark.parametrize("backend", ["csp", "sat"])
+def test_step_plays_the_game_of_start_game(backend):
+    for seed in range(3):
+        stepped, _ = new_game("medium", seed, backend, record_actions=True,
+                              budget=SearchBudget(nodes=50))
+        steps = 0
+        while stepped.step():
+            steps += 1
+        played, _ = new_game("medium", seed, backend, record_actions=True,
+                             budget=SearchBudget(nodes=50))
+        played.start_game()
+        assert stepped.actions == played.actions
+        assert steps > 0
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from benchmark import BACKENDS, play_game
+from cache import SYMMETRIES, ComponentCache, canonical_form
+from frontier import enumerate_component, get_components
+from tests.brute_force import random_system
+
+SEEDS = range(30)
+
+
+def moved(constraints, symmetry, dx=0, dy=0):
+    """
+    Returns constraints with every square moved by symmetry and translated
+    by (dx, dy).
+    """
+    result = []
+    for cs, count in constraints:
+        squares = []
+        for square in cs:
+            x, y = symmetry(*square)
+            squares.append((x + dx, y + dy))
+        result.append((squares, count))
+    return result
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_cache_matches_enumerate_component(seed):
+    rng = random.Random(seed)
+    cache = ComponentCache()
+    for _ in range(2):
+        constraints = random_system(rng, 4, 4, 9)
+        for cells, component_constraints in get_components(constraints):
+            max_mines = rng.randint(0, len(cells))
+            expected = enumerate_component(cells, component_constraints,
+                                           max_mines)
+            # once as a miss and once as a hit
+            for _ in range(2):
+                solution_counts, mine_counts = cache.enumerate_component(
+                    cells, component_constraints, max_mines)
+                assert solution_counts == expected[0]
+                assert {k: list(v) for k, v in mine_counts.items()} == \
+                    {k: list(v) for k, v in expected[1].items()}
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("symmetry", SYMMETRIES)
+def test_canonical_form_is_invariant_under_symmetries(seed, symmetry):
+    constraints = random_system(random.Random(seed))
+    for cells, component_constraints in get_components(constraints):
+        key, labels = canonical_form(cells, component_constraints)
+        other_constraints = moved(component_constraints, symmetry, 7, -3)
+        other_cells = [cell for cs, _ in moved([(cells, 0)], symmetry, 7, -3)
+                       for cell in cs]
+        other_key, _ = canonical_form(other_cells, other_constraints)
+        assert other_key == key
+        assert sorted(labels) == list(range(len(cells)))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_moved_components_are_answered_from_the_cache(seed):
+    constraints = random_system(random.Random(seed), 4, 4, 9)
+    cache = ComponentCache()
+    for cells, component_constraints in get_components(constraints):
+        other_constraints = moved(component_constraints, SYMMETRIES[5], 3, 2)
+        other_cells = [cell for cs, _ in moved([(cells, 0)], SYMMETRIES[5],
+                                               3, 2) for cell in cs]
+        cache.enumerate_component(cells, component_constraints, len(cells))
+        hits = cache.hits
+        solution_counts, mine_counts = cache.enumerate_component(
+            other_cells, other_constraints, len(cells))
+        expected = enumerate_component(other_cells, other_constraints,
+                                       len(cells))
+        assert solution_counts == expected[0]
+        assert {k: list(v) for k, v in mine_counts.items()} == \
+            {k: list(v) for k, v in expected[1].items()}
+        if len(cells) >= 8:
+            assert cache.hits == hits + 1
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = ComponentCache(max_entries=2)
+    rng = random.Random(1)
+    components = []
+    while len(components) < 3:
+        constraints = random_system(rng, 4, 4, 12)
+        for cells, component_constraints in get_components(constraints):
+            if len(cells) >= 8:
+                components.append((cells, component_constraints))
+    for cells, component_constraints in components[:3]:
+        cache.enumerate_component(cells, component_constraints, len(cells))
+    assert len(cache) <= 2
+    assert cache.evictions >= 1
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_cached_games_play_the_same(backend):
+    cache = ComponentCache()
+    for seed in range(5):
+        cached = play_game("hard", seed, backend, cache=cache)
+        plain = play_game("hard", seed, backend)
+        assert (cached["result"], cached["guesses"]) == \
+            (plain["result"], plain["guesses"])
+    assert cache.hits + cache.misses > 0
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from board import MSBoard, generate_bomb_positions
+from compact import MINE, NUMBER_MASK, CompactBoard, CompactSolver
+from neighbors import get_neighbor_table
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (1, 5), (6, 4)])
+def test_neighbors_match_the_neighbor_table(rows, cols):
+    board = CompactBoard(rows, cols, 0)
+    table = get_neighbor_table(rows, cols)
+    for i in range(rows * cols):
+        assert sorted(board.neighbors(i)) == sorted(table.neighbors[i])
+
+
+def test_layout_matches_msboard():
+    bomb_positions = generate_bomb_positions(16, 30, 99, random.Random(1))
+    board = MSBoard(16, 30, 99)
+    board.create_layout(bomb_positions)
+    board.uncover_first_non_bomb_tile()
+    compact_board = CompactBoard(16, 30, 99)
+    compact_board.create_layout(bomb_positions)
+    compact_board.uncover_first_non_bomb_tile()
+    assert compact_board.starting_point == board.starting_point
+    for i, cell in enumerate(compact_board.cells):
+        square = board.grid[i // 30][i % 30]
+        assert bool(cell & MINE) == square.is_bomb
+        assert cell & NUMBER_MASK == square.adjacent_bombs
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_large_games_end_with_consistent_actions(seed):
+    rng = random.Random(seed)
+    bomb_positions = set(generate_bomb_positions(60, 80, 700, rng))
+    board = CompactBoard(60, 80, 700)
+    board.create_layout(bomb_positions)
+    board.uncover_first_non_bomb_tile()
+    solver = CompactSolver(board=board, rng=rng)
+    solver.start_game()
+    uncovered = [sq for sq, s in solver.actions if s == "uncover"]
+    flagged = [sq for sq, s in solver.actions if s == "flag"]
+    assert set(flagged) <= bomb_positions
+    assert all(sq not in bomb_positions for sq in uncovered[:-1])
+    if solver.won_game():
+        assert board.is_solved()
+        assert len(set(uncovered)) == 60 * 80 - 700
+    else:
+        assert uncovered[-1] in bomb_positions
@@ -0,0 +1,59 @@
+from constraints import ConstraintStore
+
+
+def test_add_indexes_constraints_by_square():
+    store = ConstraintStore()
+    assert store.add([], 0) is None
+    a = store.add([1, 2, 3], 1)
+    b = store.add([3, 4], 1)
+    assert len(store) == 2
+    assert list(store.by_square[3]) == [a, b]
+    assert list(store.neighbors(a)) == [b]
+    assert store.pop_dirty() is a
+    assert store.pop_dirty() is b
+    assert store.pop_dirty() is None
+
+
+def test_mark_updates_the_constraints_of_a_square():
+    store = ConstraintStore(track_changes=True)
+    a = store.add([1, 2, 3], 2)
+    b = store.add([3, 4], 1)
+    while store.pop_dirty():
+        pass
+    assert store.pop_changed() == [a, b]
+    store.mark(3, True)
+    assert a.squares == {1, 2} and a.constant == 1
+    assert b.squares == {4} and b.constant == 0
+    assert 3 not in store.by_square
+    assert store.pop_dirty() is a
+    assert store.pop_dirty() is b
+    assert store.pop_changed() == [a, b]
+    assert store.pop_changed() == []
+    store.mark(1, False)
+    assert a.squares == {2} and a.constant == 1
+
+
+def test_reduce_and_remove():
+    store = ConstraintStore(track_changes=True)
+    a = store.add([1, 2, 3], 2)
+    b = store.add([1, 2], 1)
+    store.reduce(a, b)
+    assert a.squares == {3} and a.constant == 1
+    assert a not in store.by_square[1]
+    store.remove(b)
+    assert len(store) == 1
+    # squares without constraints leave the index
+    assert sorted(store.by_square) == [3]
+    # removed constraints are not popped
+    assert store.pop_dirty() is a
+    assert store.pop_dirty() is None
+    assert store.pop_changed() == [a]
+
+
+def test_changes_are_only_tracked_when_asked_for():
+    store = ConstraintStore()
+    a = store.add([1, 2, 3], 2)
+    store.mark(1, True)
+    store.reduce(a, store.add([2], 1))
+    assert store.changed == {}
+    assert store.pop_changed() == []
@@ -0,0 +1,140 @@
+import random
+from math import comb
+
+import pytest
+
+from budget import BudgetExceeded, SearchBudget
+from frontier import (enumerate_component, estimate_probabilities,
+                      get_components, solve_component, solve_frontier)
+from tests.brute_force import (assignments, frontier_cells, random_system,
+                               weighted_probabilities)
+
+SEEDS = range(40)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_components_partition_the_constraints(seed):
+    constraints = random_system(random.Random(seed))
+    components = get_components(constraints)
+    cells = [cell for component_cells, _ in components
+             for cell in component_cells]
+    assert sorted(cells) == sorted(frontier_cells(constraints))
+    assert sum(len(cs) for _, cs in components) == len(constraints)
+    for component_cells, component_constraints in components:
+        for cs, _ in component_constraints:
+            assert set(cs) <= set(component_cells)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_enumerate_component_matches_brute_force(seed):
+    constraints = random_system(random.Random(seed))
+    for cells, component_constraints in get_components(constraints):
+        solution_counts, mine_counts = enumerate_component(
+            cells, component_constraints, len(cells))
+        expected_solutions = {}
+        expected_mines = {}
+        for assignment in assignments(cells, component_constraints):
+            k = sum(assignment.values())
+            expected_solutions[k] = expected_solutions.get(k, 0) + 1
+            counts = expected_mines.setdefault(k, [0] * len(cells))
+            for i, cell in enumerate(cells):
+                counts[i] += assignment[cell]
+        assert solution_counts == expected_solutions
+        assert {k: list(counts) for k, counts in mine_counts.items()} == \
+            expected_mines
+
+
+def test_enumerate_component_respects_max_mines():
+    cells = [(0, 0), (0, 1), (0, 2)]
+    constraints = [(cells, 2)]
+    assert enumerate_component(cells, constraints, 1) == ({}, {})
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("num_interior", [0, 3, 20])
+def test_solve_frontier_matches_brute_force(seed, num_interior):
+    rng = random.Random(seed)
+    constraints = random_system(rng)
+    cells = frontier_cells(constraints)
+    mines_left = rng.randint(1, len(cells) + num_interior)
+
+    def weight(k):
+        if k > mines_left or mines_left - k > num_interior:
+            return 0
+        return comb(num_interior, mines_left - k)
+
+    expected, total = weighted_probabilities(cells, constraints, weight)
+    safe, mines, probabilities, interior_probability = solve_frontier(
+        constraints, mines_left, num_interior)
+    if not total:
+        assert probabilities == {}
+        return
+    assert probabilities == pytest.approx(expected)
+    assert set(safe) == {cell for cell in cells if expected[cell] == 0}
+    assert set(mines) == {cell for cell in cells if expected[cell] == 1}
+    if num_interior:
+        interior_mines = sum(weight(sum(a.values())) *
+                             (mines_left - sum(a.values()))
+                             for a in assignments(cells, constraints))
+        assert interior_probability == \
+            pytest.approx(interior_mines / total / num_interior)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_solve_component_matches_brute_force(seed):
+    constraints = random_system(random.Random(seed))
+    density = 0.2
+    for cells, component_constraints in get_components(constraints):
+        expected, _ = weighted_probabilities(
+            cells, component_constraints,
+            lambda k: (density / (1 - density)) ** k)
+        safe, mines, probabilities = solve_component(
+            cells, component_constraints, len(cells), density)
+        assert probabilities == pytest.approx(expected)
+        assert set(safe) == {cell for cell in cells if expected[cell] == 0}
+        assert set(mines) == {cell for cell in cells if expected[cell] == 1}
+
+
+def test_inconsistent_constraints_give_no_probabilities():
+    constraints = [([(0, 0), (0, 1)], 2), ([(0, 1)], 0)]
+    assert solve_frontier(constraints, 5, 10) == ([], [], {}, None)
+    assert solve_component([(0, 0), (0, 1)], constraints, 5, 0.2) == \
+        ([], [], {})
+
+
+def test_estimate_probabilities_averages_constraint_densities():
+    constraints = [([(0, 0), (0, 1)], 1), ([(0, 1), (0, 2), (0, 3)], 3)]
+    estimated = estimate_probabilities([(0, 0), (0, 1), (0, 2), (0, 3)],
+                                       constraints)
+    assert estimated == {(0, 0): 0.5, (0, 1): 0.75, (0, 2): 1.0,
+                         (0, 3): 1.0}
+
+
+def test_enumerate_component_spends_the_budget():
+    constraints = random_system(random.Random(0), 4, 4, 8)
+    cells = frontier_cells(constraints)
+    budget = SearchBudget(nodes=2)
+    budget.start()
+    with pytest.raises(BudgetExceeded):
+        enumerate_component(cells, constraints, len(cells), budget=budget)
+    assert not budget.exact
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_solve_frontier_over_budget_is_approximate(seed):
+    constraints = random_system(random.Random(seed), 4, 4, 8)
+    cells = frontier_cells(constraints)
+    budget = SearchBudget(nodes=1)
+    budget.start()
+    safe, mines, probabilities, interior_probability = solve_frontier(
+        constraints, len(cells), 10, budget=budget)
+    if budget.exact:
+        return
+    assert set(probabilities) == set(cells)
+    assert all(0 <= p <= 1 for p in probabilities.values())
+    # only squares forced within a counted component are played
+    expected, _ = weighted_probabilities(cells, constraints, lambda k: 1)
+    for cell in safe:
+        assert expected[cell] == 0
+    for cell in mines:
+        assert expected[cell] == 1
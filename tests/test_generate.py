@@ -0,0 +1,48 @@
+import pytest
+
+from board import MSBoard
+
+np = pytest.importorskip("numpy")
+
+from generate import (BLOCK_SIZE, generate_boards,  # noqa: E402
+                      generate_mines, get_block_size, seeded_bomb_positions,
+                      to_bomb_positions)
+
+
+@pytest.mark.parametrize("count", [1, 5])
+def test_boards_have_the_right_mines_and_numbers(count):
+    mines, numbers = generate_boards(9, 12, 20, count, seed=0)
+    assert mines.shape == numbers.shape == (count, 9, 12)
+    assert list(mines.sum(axis=(1, 2))) == [20] * count
+    for k in range(count):
+        board = MSBoard(9, 12, 20)
+        board.create_layout(to_bomb_positions(mines[k]))
+        assert [[square.adjacent_bombs for square in row]
+                for row in board.grid] == numbers[k].tolist()
+
+
+def test_generation_is_seeded():
+    first, _ = generate_boards(16, 30, 99, 3, seed=4)
+    second, _ = generate_boards(16, 30, 99, 3, seed=4)
+    assert (first == second).all()
+    assert (generate_mines(16, 30, 99, 3, seed=4) == first).all()
+
+
+def test_seeded_bomb_positions_are_reproducible():
+    positions = seeded_bomb_positions(16, 16, 40, 1030)
+    assert len(positions) == 40
+    assert seeded_bomb_positions(16, 16, 40, 1030) == positions
+    assert seeded_bomb_positions(16, 16, 40, 1031) != positions
+
+
+def test_large_boards_are_generated_in_smaller_blocks():
+    assert get_block_size(16, 30) == BLOCK_SIZE
+    assert get_block_size(1000, 1000) == 1
+    positions = seeded_bomb_positions(300, 300, 18000, 3)
+    assert len(positions) == 18000
+    assert seeded_bomb_positions(300, 300, 18000, 3) == positions
+
+
+def test_negative_seed_is_rejected():
+    with pytest.raises(ValueError):
+        seeded_bomb_positions(16, 16, 40, -1)
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+from record import record_game, write_records
+
+# runs main.main with the given arguments, then prints the GUI modules that
+# were imported
+SCRIPT = """
+import sys
+import main
+try:
+    main.main(sys.argv[1:])
+finally:
+    print(sorted(m for m in ("gui", "kivy") if m in sys.modules))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_main(*args):
+    return subprocess.run([sys.executable, "-c", SCRIPT, *args],
+                          capture_output=True, text=True, cwd=ROOT)
+
+
+def test_help_does_not_import_the_gui():
+    run = run_main("--help")
+    assert run.returncode == 0
+    assert "--replay" in run.stdout
+    assert run.stdout.rstrip().endswith("[]")
+
+
+def test_missing_record_does_not_import_the_gui(tmp_path):
+    filename = tmp_path / "games.jsonl"
+    write_records(filename, [record_game("easy", 0)])
+    run = run_main("--replay", str(filename), "--index", "2")
+    assert run.returncode == 2
+    assert "has no record 2" in run.stderr
+    assert run.stdout.rstrip().endswith("[]")
+
+
+def test_unreadable_record_file_fails_cleanly(tmp_path):
+    run = run_main("--replay", str(tmp_path / "missing.jsonl"))
+    assert run.returncode == 2
+    assert "Traceback" not in run.stderr
+    assert run.stdout.rstrip().endswith("[]")
@@ -0,0 +1,26 @@
+import pytest
+
+from neighbors import OFFSETS, get_neighbor_table
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (1, 4), (3, 3), (5, 7)])
+def test_table_lists_every_neighbor_in_order(rows, cols):
+    table = get_neighbor_table(rows, cols)
+    assert table.size == rows * cols
+    assert len(table.offsets) == table.size + 1
+    for i in range(rows):
+        for j in range(cols):
+            expected = [(i + dx) * cols + j + dy for dx, dy in OFFSETS
+                        if 0 <= i + dx < rows and 0 <= j + dy < cols]
+            square = i * cols + j
+            start, end = table.offsets[square], table.offsets[square + 1]
+            assert list(table.indices[start:end]) == expected
+            assert list(table.neighbors[square]) == expected
+
+
+def test_tables_are_shared_and_read_only():
+    table = get_neighbor_table(4, 6)
+    assert get_neighbor_table(4, 6) is table
+    assert get_neighbor_table(6, 4) is not table
+    with pytest.raises(AttributeError):
+        table.rows = 5
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+import patterns as patterns_module
+from benchmark import new_game
+from frontier import get_components
+from patterns import (PatternCollector, PatternTable, generate_table,
+                      write_table)
+from tests.brute_force import forced, random_system
+
+
+@pytest.fixture
+def collected():
+    collector = PatternCollector(max_cells=10)
+    rng = random.Random(0)
+    components = []
+    for _ in range(40):
+        for cells, constraints in get_components(random_system(rng)):
+            collector.add(cells, constraints)
+            components.append((cells, constraints))
+    return collector.patterns, components
+
+
+def test_table_round_trip(tmp_path, collected):
+    patterns, components = collected
+    filename = tmp_path / "patterns.bin"
+    write_table(filename, patterns, max_cells=10)
+    table = PatternTable(filename)
+    try:
+        for key, (_, safe, mines) in patterns.items():
+            assert table.lookup(key) == (safe, mines)
+        for cells, constraints in components:
+            safe, mines = table.component_moves(cells, constraints)
+            expected = forced(cells, constraints)
+            if len(cells) > 10 or expected is None:
+                continue
+            assert (set(safe), set(mines)) == expected
+    finally:
+        table.close()
+
+
+def test_lookup_tells_apart_patterns_with_the_same_hash(tmp_path, collected,
+                                                       monkeypatch):
+    patterns, _ = collected
+    keys = list(patterns)
+    missing = keys.pop()
+    monkeypatch.setattr(patterns_module, "pattern_hash", lambda key: 1)
+    filename = tmp_path / "patterns.bin"
+    write_table(filename, {key: patterns[key] for key in keys}, max_cells=10)
+    table = PatternTable(filename)
+    try:
+        for key in keys:
+            assert table.lookup(key) == patterns[key][1:]
+        assert table.lookup(missing) is None
+    finally:
+        table.close()
+
+
+def test_generated_table_is_written_to_a_new_directory(tmp_path):
+    filename = tmp_path / "data" / "patterns.bin"
+    num_patterns = generate_table(str(filename), ["hard"], 20)
+    assert num_patterns > 0
+    table = PatternTable(filename)
+    try:
+        assert table.max_cells == patterns_module.PATTERN_CELLS
+    finally:
+        table.close()
+
+
+def test_invalid_table_is_rejected(tmp_path):
+    filename = tmp_path / "patterns.bin"
+    filename.write_bytes(b"not a pattern table")
+    with pytest.raises(ValueError):
+        PatternTable(filename)
+
+
+@pytest.fixture(scope="module")
+def generated(tmp_path_factory):
+    filename = tmp_path_factory.mktemp("patterns") / "patterns.bin"
+    generate_table(str(filename), ["hard"], 50)
+    return filename
+
+
+@pytest.mark.parametrize("backend", ["csp", "bitboard", "compact"])
+def test_games_with_patterns_play_the_same_moves(generated, backend):
+    table = PatternTable(generated)
+    try:
+        hits = 0
+        for seed in range(5):
+            solver, _ = new_game("hard", seed, backend, patterns=table,
+                                 record_actions=True)
+            solver.start_game()
+            plain, _ = new_game("hard", seed, backend, record_actions=True)
+            plain.start_game()
+            assert solver.won_game() == plain.won_game()
+            assert set(solver.actions) == set(plain.actions)
+            assert solver.search_size == plain.search_size
+            hits += solver.pattern_hits
+        assert hits
+    finally:
+        table.close()
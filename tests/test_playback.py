@@ -0,0 +1,46 @@
+from playback import ActionPlayback
+
+ACTIONS = [((0, i), "uncover") for i in range(10)]
+
+
+def test_advance_plays_the_due_actions():
+    playback = ActionPlayback(actions=ACTIONS, speed=10)
+    # the first action is due at once, then one every 0.1s
+    assert playback.advance(0) == ACTIONS[:1]
+    assert playback.advance(0.25) == ACTIONS[1:3]
+    assert playback.advance(10) == ACTIONS[3:]
+    assert playback.is_done()
+    assert playback.advance(1) == []
+
+
+def test_instant_mode_plays_everything():
+    playback = ActionPlayback(actions=ACTIONS, speed=None)
+    assert playback.advance(0) == ACTIONS
+
+
+def test_pause():
+    playback = ActionPlayback(actions=ACTIONS, speed=10)
+    playback.advance(0)
+    playback.toggle_pause()
+    assert playback.advance(5) == []
+    playback.resume()
+    assert playback.advance(0.1) == ACTIONS[1:2]
+
+
+def test_set_speed_keeps_the_next_action():
+    playback = ActionPlayback(actions=ACTIONS, speed=10)
+    playback.advance(0.15)
+    playback.set_speed(20)
+    assert playback.advance(0.05) == ACTIONS[2:3]
+    # leaving instant mode, the next action is due at once
+    playback.set_speed(None)
+    playback.set_speed(10)
+    assert playback.advance(0) == ACTIONS[3:4]
+    assert playback.advance(0) == []
+
+
+def test_skip_coalesces_actions_by_square():
+    actions = [((0, 0), "flag"), ((0, 1), "uncover"), ((0, 0), "uncover")]
+    playback = ActionPlayback(actions=actions, speed=1)
+    assert playback.skip() == [((0, 0), "uncover"), ((0, 1), "uncover")]
+    assert playback.is_done()
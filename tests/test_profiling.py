@@ -0,0 +1,66 @@
+import csv
+import json
+
+import pytest
+
+from benchmark import BACKENDS, CSV_HEADERS, main, new_game, play_game
+from csp import MSCSP
+from profiling import PHASES, PROFILE_HEADERS, Profiler, sum_profiles
+
+
+def test_wrap_counts_calls_and_time():
+    profiler = Profiler()
+
+    def fail():
+        raise KeyError
+
+    timed = profiler.wrap("search", lambda x: x + 1)
+    assert timed(1) == 2
+    with pytest.raises(KeyError):
+        profiler.wrap("search", fail)()
+    assert profiler.calls["search"] == 2
+    assert profiler.seconds["search"] >= 0
+    profiler.count("solutions", 3)
+    assert profiler.as_dict()["solutions"] == 3
+    assert list(profiler.as_dict()) == PROFILE_HEADERS
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_profiled_games_play_the_same(backend):
+    for seed in range(3):
+        profiled = play_game("medium", seed, backend, profile=True)
+        plain = play_game("medium", seed, backend)
+        profile = profiled.pop("profile")
+        del profiled["time"], plain["time"]
+        assert profiled == plain
+        assert profile["uncover_square calls"] > 0
+        if profile["search calls"]:
+            assert profile["components"] > 0
+            assert profile["solutions"] > 0
+
+
+def test_only_the_profiled_instance_is_instrumented():
+    solver, _ = new_game("easy", 0)
+    Profiler().instrument(solver)
+    for phase in PHASES:
+        assert getattr(solver, phase) is not getattr(MSCSP, phase)
+        assert "timed" in getattr(solver, phase).__name__
+        assert getattr(MSCSP, phase).__name__ == phase
+
+
+def test_sum_profiles():
+    a = dict.fromkeys(PROFILE_HEADERS, 1)
+    b = dict.fromkeys(PROFILE_HEADERS, 2)
+    assert sum_profiles([a, b]) == dict.fromkeys(PROFILE_HEADERS, 3)
+
+
+def test_profile_files(tmp_path):
+    main(["-n", "3", "-d", "easy", "--profile", "-o", str(tmp_path)])
+    with open(tmp_path / "easy-stats.csv", encoding="utf-8-sig") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == CSV_HEADERS + PROFILE_HEADERS
+    assert len(rows) == 4
+    with open(tmp_path / "easy-profile.json", encoding="utf-8") as file:
+        profiles = json.load(file)
+    assert len(profiles["games"]) == 3
+    assert profiles["total"] == sum_profiles(profiles["games"])
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from benchmark import BACKENDS
+from board import MSBoard
+from record import (bomb_positions, check_records, decode_actions,
+                    dump_record, encode_actions, first_difference, main,
+                    read_records, record_game, replay_record, starting_point,
+                    write_records)
+
+
+def test_actions_round_trip():
+    actions = [((0, 0), "uncover"), ((2, 3), "flag"), ((3, 4), "uncover"),
+               ((0, 1), "flag")]
+    encoded = encode_actions(actions, 5)
+    assert encoded == [0, ~13, 19, ~1]
+    assert decode_actions(encoded, 5) == actions
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_replay_is_identical(backend):
+    for seed in range(3):
+        record = record_game("easy", seed, backend)
+        assert dump_record(replay_record(record)) == dump_record(record)
+
+
+def test_records_round_trip_through_a_file(tmp_path):
+    filename = tmp_path / "games.jsonl"
+    records = [record_game("easy", seed) for seed in range(5)]
+    write_records(filename, records)
+    assert list(read_records(filename)) == records
+    assert check_records(filename) == ([], [])
+    assert check_records(filename, workers=2) == ([], [])
+
+
+def test_replay_starts_on_the_recorded_square():
+    record = record_game("easy", 0)
+    mines = set(record["mines"])
+    start = next(i for i in range(record["rows"] * record["cols"])
+                 if i not in mines and i != record["start"])
+    record["start"] = start
+    replay = replay_record(record)
+    assert replay["start"] == start
+    # the GUI lays out a replayed record's board the same way
+    board = MSBoard(record["rows"], record["cols"], record["num_mines"])
+    board.create_layout(bomb_positions(record))
+    board.uncover_starting_point(*starting_point(record))
+    assert board.starting_point == divmod(start, record["cols"])
+    assert board.grid[board.starting_point[0]][
+        board.starting_point[1]].is_uncovered
+
+
+def test_record_command_creates_the_output_directory(tmp_path):
+    filename = tmp_path / "records" / "easy.jsonl"
+    assert main(["record", "-d", "easy", "-n", "2", "-o",
+                 str(filename)]) == 0
+    assert [r["seed"] for r in read_records(filename)] == [0, 1]
+
+
+def test_check_reports_layout_and_solver_mismatches(tmp_path):
+    filename = tmp_path / "games.jsonl"
+    records = [record_game("easy", seed) for seed in range(3)]
+    # another seed generates another layout, but the recorded one replays
+    records[1]["seed"] += 100
+    records[2]["actions"][3] = ~records[2]["actions"][3]
+    write_records(filename, records)
+    with open(filename, "a", encoding="utf-8") as file:
+        file.write("\n")
+    layout_mismatches, solver_mismatches = check_records(filename)
+    assert layout_mismatches == [2]
+    assert solver_mismatches == [(3, 3)]
+
+
+def test_first_difference():
+    assert first_difference([1, 2, 3], [1, 2, 3]) is None
+    assert first_difference([1, 2, 3], [1, 4, 3]) == 1
+    assert first_difference([1, 2], [1, 2, 3]) == 2
+
+
+def test_dump_record_is_canonical():
+    assert dump_record({"b": 1, "a": [1, 2]}) == '{"a":[1,2],"b":1}'
+    assert json.loads(dump_record({"b": 1})) == {"b": 1}
@@ -0,0 +1,86 @@
+import random
+from math import sqrt
+
+import pytest
+
+from budget import SearchBudget
+from frontier import get_components
+from sampler import MIN_SAMPLES, sample_component
+from tests.brute_force import random_system, weighted_probabilities
+
+SEEDS = range(20)
+DENSITY = 0.2
+
+
+def components(seed):
+    constraints = random_system(random.Random(seed), 4, 4, 8)
+    return get_components(constraints)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sample_component_estimates_the_probabilities(seed):
+    for cells, constraints in components(seed):
+        expected, _ = weighted_probabilities(
+            cells, constraints, lambda k: (DENSITY / (1 - DENSITY)) ** k)
+        sampled = sample_component(cells, constraints, DENSITY,
+                                   samples=4000, target_error=0.01)
+        if sampled is None:
+            continue
+        probabilities, errors = sampled
+        for cell in cells:
+            assert abs(probabilities[cell] - expected[cell]) <= \
+                4 * errors[cell] + 0.02
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sample_component_is_deterministic(seed):
+    for cells, constraints in components(seed):
+        assert sample_component(cells, constraints, DENSITY) == \
+            sample_component(cells, constraints, DENSITY)
+
+
+def test_inconsistent_component_has_no_samples():
+    cells = [(0, 0), (0, 1)]
+    constraints = [(cells, 2), ([(0, 1)], 0)]
+    assert sample_component(cells, constraints, DENSITY) is None
+
+
+def test_sampling_spends_the_budget():
+    cells = [(0, i) for i in range(10)]
+    constraints = [(cells[:5], 2), (cells[4:], 3)]
+    budget = SearchBudget(nodes=10 * 300)
+    budget.start()
+    sampled = sample_component(cells, constraints, DENSITY, samples=1000,
+                               target_error=0, budget=budget)
+    assert sampled is not None
+    assert budget.used == 10 * 300
+
+
+def test_sampling_without_budget_left_falls_back():
+    cells = [(0, i) for i in range(10)]
+    constraints = [(cells[:5], 2), (cells[4:], 3)]
+    budget = SearchBudget(nodes=10 * (MIN_SAMPLES - 1))
+    budget.start()
+    assert sample_component(cells, constraints, DENSITY,
+                            budget=budget) is None
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_numpy_and_python_samplers_agree(seed):
+    pytest.importorskip("numpy")
+    for cells, constraints in components(seed):
+        python = sample_component(cells, constraints, DENSITY, samples=4000,
+                                  target_error=0.01, seed=seed)
+        vectorized = sample_component(cells, constraints, DENSITY,
+                                      samples=4000, target_error=0.01,
+                                      seed=seed, vectorized=True)
+        assert (python is None) == (vectorized is None)
+        if python is None:
+            continue
+        assert sample_component(cells, constraints, DENSITY, samples=4000,
+                                target_error=0.01, seed=seed,
+                                vectorized=True) == vectorized
+        for cell in cells:
+            error = sqrt(python[1][cell] ** 2 + vectorized[1][cell] ** 2)
+            assert abs(python[0][cell] - vectorized[0][cell]) <= \
+                4 * error + 0.02
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from benchmark import new_game
+from budget import BudgetExceeded, SearchBudget
+from frontier import get_components
+from sat import CardinalitySolver, forced_component_squares, forced_squares
+from tests.brute_force import (assignments, forced, frontier_cells,
+                               random_system)
+
+SEEDS = range(40)
+
+
+def engines():
+    result = ["python"]
+    try:
+        import pysat.solvers  # noqa: F401
+        result.append("pysat")
+    except ImportError:
+        pass
+    return result
+
+
+@pytest.mark.parametrize("engine", engines())
+@pytest.mark.parametrize("seed", SEEDS)
+def test_forced_component_squares_match_brute_force(engine, seed):
+    rng = random.Random(seed)
+    constraints = random_system(rng)
+    for cells, component_constraints in get_components(constraints):
+        min_mines = rng.randint(0, min(2, len(cells)))
+        max_mines = rng.randint(min_mines, len(cells))
+        expected = forced(cells, component_constraints, min_mines, max_mines)
+        result = forced_component_squares(cells, component_constraints,
+                                          min_mines, max_mines, engine)
+        if expected is None:
+            assert result is None
+        else:
+            assert (set(result[0]), set(result[1])) == expected
+
+
+@pytest.mark.parametrize("engine", engines())
+@pytest.mark.parametrize("seed", SEEDS)
+def test_forced_squares_are_sound(engine, seed):
+    rng = random.Random(seed)
+    constraints = random_system(rng)
+    cells = frontier_cells(constraints)
+    num_interior = rng.randint(0, 5)
+    mines_left = rng.randint(0, len(cells) + num_interior)
+    models = [a for a in assignments(cells, constraints)
+              if 0 <= mines_left - sum(a.values()) <= num_interior]
+    result = forced_squares(constraints, mines_left, num_interior, engine)
+    if result is None:
+        assert not models
+        return
+    safe, mines = result
+    for model in models:
+        assert not any(model[cell] for cell in safe)
+        assert all(model[cell] for cell in mines)
+
+
+def test_cardinality_solver_finds_models():
+    solver = CardinalitySolver(4)
+    solver.add_constraint([0, 1, 2], 2, 2)
+    solver.add_constraint([2, 3], 0, 0)
+    model = solver.solve()
+    assert model == [True, True, False, False]
+    assert solver.solve([(0, False)]) is None
+
+
+def test_cardinality_solver_spends_the_budget():
+    budget = SearchBudget(nodes=1)
+    budget.start()
+    solver = CardinalitySolver(6, budget)
+    solver.add_constraint(list(range(6)), 3, 3)
+    with pytest.raises(BudgetExceeded):
+        solver.solve()
+
+
+@pytest.mark.parametrize("budget", [None, SearchBudget(nodes=5)])
+def test_sat_backend_plays_games(budget):
+    for seed in range(5):
+        solver, bomb_positions = new_game("easy", seed, "sat", budget=budget)
+        solver.start_game()
+        assert solver.won_game() or solver.lost_game
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import session
+from benchmark import BACKENDS, play_game
+from session import MSSession, truncate_decimal
+
+
+def test_truncate_decimal():
+    assert truncate_decimal("12.34567", 2) == "12.34"
+    assert truncate_decimal("0.5", 1) == "0.5"
+
+
+def test_session_counts_covered_safe_squares():
+    first = MSSession(difficulty="easy", gamemode="player")
+    second = MSSession(difficulty="hard", gamemode="computer")
+    first.start(9, 9, 10)
+    second.start(16, 30, 99)
+    for _ in range(70):
+        assert not first.uncover_safe_tile()
+    assert first.uncover_safe_tile()
+    assert second.safe_tiles_covered == 16 * 30 - 99
+
+
+def test_elapsed_time_str(monkeypatch):
+    s = MSSession()
+    monkeypatch.setattr(session.time, "time", lambda: 100.0)
+    s.start(9, 9, 10)
+    monkeypatch.setattr(session.time, "time", lambda: 112.3456)
+    assert s.elapsed_time_str() == "12.34s"
+    monkeypatch.setattr(session.time, "time", lambda: 163.0)
+    assert s.elapsed_time_str() == "1.05min"
+
+
+def test_games_run_concurrently_in_one_process():
+    games = [(seed, backend) for seed in range(8) for backend in BACKENDS]
+
+    def result(game):
+        r = play_game("medium", *game)
+        return r["result"], r["guesses"], r["search_size"]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        concurrent = list(executor.map(result, games))
+    assert concurrent == [result(game) for game in games]
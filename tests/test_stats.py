@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+from benchmark import write_stats_csv
+from report import (bootstrap_win_rate, compare_runs, format_report,
+                    mann_whitney_test, sample_binomial, two_proportion_test)
+from stats import (StatsTable, load_stats, percentile, read_stats_csv,
+                   summarize, summarize_all)
+
+
+def table(times, wins):
+    result = StatsTable()
+    for i, (time, won) in enumerate(zip(times, wins)):
+        result.append(i + 1, time, won, guesses=i, search_size=2 * i)
+    return result
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([3.0], 99) == 3.0
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 100) == 5.0
+    assert percentile(values, 90) == pytest.approx(4.6)
+
+
+def test_stats_csv_round_trip(tmp_path):
+    results = [{"time": 0.5, "result": "W", "guesses": 1, "search_size": 4},
+               {"time": 0.25, "result": "L", "guesses": 3, "search_size": 9}]
+    filename = tmp_path / "hard-stats.csv"
+    write_stats_csv(filename, results)
+    read = read_stats_csv(filename)
+    assert list(read.iterations) == [1, 2]
+    assert list(read.times) == [0.5, 0.25]
+    assert list(read.wins) == [1, 0]
+    assert list(read.guesses) == [1, 3]
+    assert list(read.search_sizes) == [4, 9]
+    tables = load_stats(["hard"], tmp_path)
+    assert summarize_all(tables) == {"hard": summarize(read)}
+
+
+def test_stats_csv_without_guesses(tmp_path):
+    filename = tmp_path / "easy-stats.csv"
+    filename.write_text("Iteration,Time (seconds),Result\n1,0.1,W\n\n",
+                        encoding="utf-8")
+    read = read_stats_csv(filename)
+    assert len(read) == 1
+    assert len(read.guesses) == 0
+    assert summarize(read)["mean_guesses"] is None
+
+
+def test_summarize():
+    summary = summarize(table([0.1, 0.3, 0.2, 0.4], [1, 0, 1, 0]))
+    assert summary["games"] == 4
+    assert summary["wins"] == 2
+    assert summary["win_rate"] == 50
+    assert summary["mean_time"] == pytest.approx(0.25)
+    assert summary["mean_win_time"] == pytest.approx(0.15)
+    assert summary["max_time"] == 0.4
+    assert summary["mean_guesses"] == 1.5
+    assert summary["max_search_size"] == 6
+    assert summarize(StatsTable())["win_rate"] is None
+
+
+def test_sample_binomial_stays_in_range():
+    rng = random.Random(0)
+    for n, p in ((10, 0.5), (1000, 0.01), (1000, 0.99), (5, 0), (5, 1)):
+        for _ in range(50):
+            assert 0 <= sample_binomial(rng, n, p) <= n
+    assert sample_binomial(rng, 5, 1) == 5
+
+
+def test_bootstrap_interval_contains_the_win_rate():
+    low, high = bootstrap_win_rate(40, 100)
+    assert low <= 40 <= high
+    assert bootstrap_win_rate(40, 100) == (low, high)
+    assert bootstrap_win_rate(0, 0) == (None, None)
+
+
+def test_two_proportion_test():
+    assert two_proportion_test(50, 100, 50, 100) == pytest.approx(1.0)
+    assert two_proportion_test(20, 100, 80, 100) < 0.001
+    assert two_proportion_test(0, 0, 1, 1) == 1.0
+
+
+def test_mann_whitney_test():
+    a = [0.1 * i for i in range(30)]
+    assert mann_whitney_test(a, a) == pytest.approx(1.0)
+    assert mann_whitney_test(a, [x + 10 for x in a]) < 0.001
+    assert mann_whitney_test([], a) == 1.0
+
+
+def test_compare_runs_flags_regressions():
+    old = {"hard": table([0.1] * 100, [1] * 60 + [0] * 40)}
+    new = {"hard": table([0.2 + 0.001 * i for i in range(100)],
+                         [1] * 30 + [0] * 70)}
+    flags = [flag for _, _, _, flag in compare_runs(old, new)]
+    assert flags == ["REGRESSION", "REGRESSION"]
+    flags = [flag for _, _, _, flag in compare_runs(new, old)]
+    assert flags == ["improvement", "improvement"]
+
+
+def test_format_report():
+    lines = format_report({"easy": table([0.1, 0.2], [1, 0]),
+                           "hard": StatsTable()})
+    assert len(lines) == 3
+    assert lines[1].startswith("easy")
+    assert "50.0%" in lines[1]
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+pytest.importorskip("kivy")
+
+from textures import (BOMB, FLAG, NUMBER, TILE, TILE_IMAGES,  # noqa: E402
+                      number)
+
+
+def test_every_tile_image_exists():
+    for name in TILE_IMAGES:
+        assert os.path.isfile(f"images/{name}.png")
+
+
+def test_atlas_indices():
+    assert TILE_IMAGES[TILE] == "tile"
+    assert TILE_IMAGES[FLAG] == "flag"
+    assert TILE_IMAGES[BOMB] == "bomb"
+    assert [TILE_IMAGES[number(n)] for n in range(9)] == \
+        [f"number-{n}" for n in range(9)]
+    assert number(0) == NUMBER
@@ -0,0 +1,63 @@
+"""
+Shared texture atlas of the tile images.
+
+The images in images/ are drawn once, scaled to TEXTURE_SIZE, side by side
+into a single texture, and every tile shows a region of it chosen by index.
+Switching a tile's image is then a texture swap, with no path lookup or
+image load.
+"""
+from functools import lru_cache
+
+from kivy.core.image import Image as CoreImage
+from kivy.graphics import ClearBuffers, ClearColor, Fbo, Rectangle
+
+# atlas indices of the tile images; the number n is at NUMBER + n
+TILE = 0
+FLAG = 1
+BOMB = 2
+NUMBER = 3
+
+TILE_IMAGES = ["tile", "flag", "bomb"] + [f"number-{n}" for n in range(9)]
+
+# width and height in pixels of every image in the atlas
+TEXTURE_SIZE = 128
+
+
+class TileAtlas():
+    """
+    The tile images packed into one texture, left to right in the order of
+    TILE_IMAGES. regions[i] is the texture region of image i.
+    """
+
+    def __init__(self, size=TEXTURE_SIZE):
+        self.fbo = Fbo(size=(size * len(TILE_IMAGES), size))
+        with self.fbo:
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+            for i, name in enumerate(TILE_IMAGES):
+                texture = CoreImage(f"images/{name}.png").texture
+                Rectangle(texture=texture, pos=(i * size, 0),
+                          size=(size, size))
+        self.fbo.draw()
+        self.texture = self.fbo.texture
+        self.regions = [self.texture.get_region(i * size, 0, size, size)
+                        for i in range(len(TILE_IMAGES))]
+
+    def __getitem__(self, index):
+        return self.regions[index]
+
+
+@lru_cache(maxsize=None)
+def get_tile_atlas():
+    """
+    Returns the atlas shared by every tile. Needs a GL context, so it must
+    be called once the window exists.
+    """
+    return TileAtlas()
+
+
+def number(n):
+    """
+    Returns the atlas index of the image of a square with n adjacent bombs.
+    """
+    return NUMBER + n